@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from pandas.api.types import is_numeric_dtype
 from datetime import datetime, timedelta
 import json
 import time
@@ -12,17 +15,23 @@ import math
 # Update the imports in app.py - remove problematic ones
 from database import (
     init_database, seed_sample_data, get_all_vehicles, get_vehicle_by_id,
-    get_all_alerts, get_all_service_centers, get_all_bookings, get_all_feedback,
+    get_alert_overview, get_all_service_centers, get_all_bookings, get_all_feedback,
     get_dashboard_stats, get_agent_logs, get_rca_reports, update_booking_status,
-    create_feedback, get_telemetry_history, save_telemetry,
+    create_feedback, get_telemetry_history, save_telemetry, save_telemetry_batch,
     # Add new functions
-    get_nearby_garages, get_parts_catalog, create_breakdown_incident,
+    get_nearby_garages, get_parts_catalog, get_parts_catalog_columns, create_breakdown_incident,
     update_breakdown_estimate, get_breakdown_history, seed_additional_data,
     create_booking,
     # Keep only these garage functions that actually exist
-    get_garage_by_id, update_garage_load,get_all_garages,  # Add this
+    get_garage_by_id, update_garage_load, update_garage_capacity, get_all_garages,  # Add this
     get_breakdowns_for_garage,  # Add this
+    get_garage_dashboard_state,
     update_breakdown_status,  # Add this
+    mark_breakdown_completed,
+    get_breakdowns_by_garage_and_status, start_breakdown_fix, complete_breakdown_fix,
+    use_parts_for_breakdown, generate_breakdown_invoice, update_part_stock,
+    get_technician_by_id, create_technician, assign_technician, get_garage_technicians,
+    get_garage_analytics, get_garage_feedback,
     update_breakdown_estimate,  # Add this
     update_garage_load,  # Add this
     get_garage_by_id,
@@ -31,6 +40,9 @@ from telemetry import TelemetrySimulator, generate_fleet_telemetry, analyze_tele
 from predictive_engine import get_prediction_engine
 from agents import get_master_agent, CustomerAgent
 
+# Serialize every figure with orjson instead of the stdlib json encoder
+pio.json.config.default_engine = "orjson"
+
 st.set_page_config(
     page_title="AutoSenseAI - Predictive Maintenance Platform",
     page_icon="🚗",
@@ -103,7 +115,33 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_resource
+ALERT_COLUMN_CONFIG = {
+    "vin": st.column_config.TextColumn("VIN"),
+    "make": st.column_config.TextColumn("Make"),
+    "model": st.column_config.TextColumn("Model"),
+    "component": st.column_config.TextColumn("Component"),
+    "severity": st.column_config.TextColumn("Severity"),
+    "description": st.column_config.TextColumn("Description", width="large"),
+    "failure_probability": st.column_config.ProgressColumn(
+        "Failure Probability",
+        format="%.2f",
+        min_value=0.0,
+        max_value=1.0
+    ),
+    "created_at": st.column_config.DatetimeColumn("Created At", format="YYYY-MM-DD HH:mm")
+}
+
+BOOKING_COLUMN_CONFIG = {
+    "booking_date": st.column_config.DateColumn("Booking Date"),
+    "make": st.column_config.TextColumn("Make"),
+    "model": st.column_config.TextColumn("Model"),
+    "owner_name": st.column_config.TextColumn("Customer"),
+    "service_type": st.column_config.TextColumn("Service Type"),
+    "completed_at": st.column_config.DatetimeColumn("Completed At", format="YYYY-MM-DD HH:mm")
+}
+
+# Schema setup and seeding run once per server process, not on every rerun
+@st.cache_resource(show_spinner=False)
 def initialize_app():
     init_database()
     seed_sample_data()
@@ -112,6 +150,10 @@ def initialize_app():
 
 initialize_app()
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_dashboard_stats():
+    return get_dashboard_stats()
+
 def render_oem_dashboard():
     st.markdown("## OEM Analytics Dashboard")
     
@@ -126,12 +168,14 @@ def render_oem_dashboard():
                 results = []
                 progress = st.progress(0)
                 
-                for i, vehicle in enumerate(vehicles):
-                    scenario = 'random'
-                    simulator = TelemetrySimulator(vehicle['id'], scenario)
-                    telemetry = simulator.generate_telemetry()
-                    save_telemetry(vehicle['id'], telemetry)
-                    
+                # One reading per vehicle, written in a single transaction
+                readings = [
+                    (vehicle['id'], TelemetrySimulator(vehicle['id'], 'random').generate_telemetry())
+                    for vehicle in vehicles
+                ]
+                save_telemetry_batch(readings)
+                
+                for i, (vehicle, (_, telemetry)) in enumerate(zip(vehicles, readings)):
                     result = master_agent.orchestrate(telemetry, vehicle)
                     results.append(result)
                     progress.progress((i + 1) / len(vehicles))
@@ -139,10 +183,11 @@ def render_oem_dashboard():
                 critical_count = sum(1 for r in results if r['status'] == 'critical')
                 warning_count = sum(1 for r in results if r['status'] == 'warning')
                 
+                _cached_dashboard_stats.clear()
                 st.success(f"Fleet analysis complete! Analyzed {len(vehicles)} vehicles. Found {critical_count} critical and {warning_count} warning issues.")
                 st.rerun()
     
-    stats = get_dashboard_stats()
+    stats = st.session_state.get('stats') or _cached_dashboard_stats()
     
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     
@@ -197,12 +242,18 @@ def render_oem_dashboard():
             st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("### Active Alerts")
-    alerts = get_all_alerts('active')
+    alerts = get_alert_overview('active')
     if alerts:
         alerts_df = pd.DataFrame(alerts)
         display_cols = ['vin', 'make', 'model', 'component', 'severity', 'description', 'failure_probability', 'created_at']
         available_cols = [c for c in display_cols if c in alerts_df.columns]
-        st.dataframe(alerts_df[available_cols], use_container_width=True)
+        alerts_df['created_at'] = pd.to_datetime(alerts_df['created_at'], errors='coerce')
+        st.dataframe(
+            alerts_df[available_cols],
+            column_config=ALERT_COLUMN_CONFIG,
+            use_container_width=True,
+            hide_index=True
+        )
     else:
         st.info("No active alerts at this time.")
     
@@ -248,6 +299,17 @@ def render_oem_dashboard():
             )
             st.plotly_chart(fig, use_container_width=True)
 
+@st.cache_data(ttl=30)
+def _bookings_with_keys(status):
+    bookings = get_all_bookings(status)
+    for booking in bookings:
+        booking_id = booking['id']
+        booking['_start_key'] = f"start_{booking_id}"
+        booking['_cancel_key'] = f"cancel_{booking_id}"
+        booking['_notes_key'] = f"notes_{booking_id}"
+        booking['_complete_key'] = f"complete_{booking_id}"
+    return bookings
+
 def render_service_center_view():
     st.markdown("## Service Center Management")
     
@@ -271,7 +333,7 @@ def render_service_center_view():
     tab1, tab2, tab3 = st.tabs(["Scheduled Bookings", "In Progress", "Completed"])
     
     with tab1:
-        scheduled = get_all_bookings('scheduled')
+        scheduled = _bookings_with_keys('scheduled')
         if scheduled:
             for booking in scheduled:
                 with st.expander(f"📅 {booking['booking_date']} {booking['booking_time']} - {booking['make']} {booking['model']}"):
@@ -288,30 +350,36 @@ def render_service_center_view():
                     
                     col1, col2 = st.columns(2)
                     with col1:
-                        if st.button("Start Service", key=f"start_{booking['id']}"):
+                        if st.button("Start Service", key=booking['_start_key']):
                             update_booking_status(booking['id'], 'in_progress')
+                            _bookings_with_keys.clear()
+                            _cached_dashboard_stats.clear()
                             st.success("Service started!")
                             st.rerun()
                     with col2:
-                        if st.button("Cancel", key=f"cancel_{booking['id']}"):
+                        if st.button("Cancel", key=booking['_cancel_key']):
                             update_booking_status(booking['id'], 'cancelled')
+                            _bookings_with_keys.clear()
+                            _cached_dashboard_stats.clear()
                             st.warning("Booking cancelled")
                             st.rerun()
         else:
             st.info("No scheduled bookings.")
     
     with tab2:
-        in_progress = get_all_bookings('in_progress')
+        in_progress = _bookings_with_keys('in_progress')
         if in_progress:
             for booking in in_progress:
                 with st.expander(f"🔧 {booking['make']} {booking['model']} - {booking['service_type']}"):
                     st.write(f"**Customer:** {booking['owner_name']}")
                     st.write(f"**Started:** {booking['booking_date']} {booking['booking_time']}")
                     
-                    notes = st.text_area("Technician Notes", key=f"notes_{booking['id']}")
+                    notes = st.text_area("Technician Notes", key=booking['_notes_key'])
                     
-                    if st.button("Complete Service", key=f"complete_{booking['id']}"):
+                    if st.button("Complete Service", key=booking['_complete_key']):
                         update_booking_status(booking['id'], 'completed', notes)
+                        _bookings_with_keys.clear()
+                        _cached_dashboard_stats.clear()
                         st.success("Service completed!")
                         st.rerun()
         else:
@@ -323,7 +391,14 @@ def render_service_center_view():
             completed_df = pd.DataFrame(completed)
             display_cols = ['booking_date', 'make', 'model', 'owner_name', 'service_type', 'completed_at']
             available_cols = [c for c in display_cols if c in completed_df.columns]
-            st.dataframe(completed_df[available_cols], use_container_width=True)
+            completed_df['booking_date'] = pd.to_datetime(completed_df['booking_date'], errors='coerce')
+            completed_df['completed_at'] = pd.to_datetime(completed_df['completed_at'], errors='coerce')
+            st.dataframe(
+                completed_df[available_cols],
+                column_config=BOOKING_COLUMN_CONFIG,
+                use_container_width=True,
+                hide_index=True
+            )
         else:
             st.info("No completed services yet.")
 
@@ -403,6 +478,7 @@ def render_vehicle_owner_portal():
                 result = master_agent.orchestrate(telemetry, vehicle)
                 
                 st.session_state['last_diagnostic'] = result
+                _cached_dashboard_stats.clear()
                 st.success("Diagnostics complete!")
                 st.rerun()
         
@@ -452,6 +528,8 @@ def render_vehicle_owner_portal():
                 priority='normal',
                 estimated_duration=60
             )
+            _bookings_with_keys.clear()
+            _cached_dashboard_stats.clear()
             st.success(f"Booking confirmed for {service_date} at {service_time}!")
             st.session_state['show_booking'] = False
             st.rerun()
@@ -764,10 +842,12 @@ def render_breakdown_assistance():
         
         # Show breakdown history
         st.markdown("### 📋 Breakdown History")
-        breakdowns = get_breakdown_history(selected_vehicle_id)
+        breakdowns = get_breakdown_history(selected_vehicle_id, limit=3)
         
         if breakdowns:
-            for bd in breakdowns[:3]:  # Show last 3 breakdowns
+            # Build all cards first and send them as one markdown element
+            history_html = []
+            for bd in breakdowns:  # Last 3 breakdowns, limited in SQL
                 status_color = {
                     'reported': 'orange',
                     'assigned': 'blue',
@@ -776,17 +856,162 @@ def render_breakdown_assistance():
                     'cancelled': 'red'
                 }.get(bd['status'], 'gray')
                 
-                st.markdown(f"""
+                history_html.append(f"""
                 <div style="border-left: 4px solid {status_color}; padding-left: 10px; margin: 10px 0;">
                     <p><strong>{bd['breakdown_type']}</strong> - {bd['reported_at'][:16]}</p>
                     <p>Status: <span style="color: {status_color}; font-weight: bold">{bd['status'].replace('_', ' ').title()}</span></p>
                     {f"<p>Garage: {bd.get('garage_name', 'Not assigned')}</p>" if bd.get('garage_name') else ""}
                     {f"<p>Est. Fix Time: {bd.get('estimated_fix_time', 'N/A')} mins</p>" if bd.get('estimated_fix_time') else ""}
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+            st.markdown("\n".join(history_html), unsafe_allow_html=True)
         else:
             st.info("No breakdown history for this vehicle.")
 
+PART_CATEGORY_FILTERS = ("All", "Engine", "Electrical", "Brakes", "Tires", "Suspension", "Cooling")
+
+TECHNICIAN_SPECIALIZATIONS = ("General", "Engine", "Electrical", "Brakes", "Transmission", "AC")
+
+TECHNICIAN_STATUS_COLORS = {"available": "green", "busy": "red"}
+
+PARTS_SORT_OPTIONS = {
+    "Price (Low to High)": ('oem_price', False),
+    "Price (High to Low)": ('oem_price', True),
+    "Name": ('part_name', False),
+    "Stock": ('stock_quantity', True),
+    "Lead Time": ('lead_time_days', False)
+}
+
+PARTS_HOVER_COLUMNS = ['part_name', 'oem_price', 'stock_quantity']
+
+@st.cache_data(ttl=300)
+def _cached_parts(make, category, sort_by="Name"):
+    order_by, descending = PARTS_SORT_OPTIONS[sort_by]
+    return get_parts_catalog_columns(make=make, category=category, order_by=order_by,
+                                     descending=descending)
+
+@st.cache_data(ttl=300)
+def _cached_all_garages():
+    return get_all_garages()
+
+GARAGE_JOBS_PAGE_SIZE = 50
+
+@st.cache_data(ttl=10)
+def load_garage_dashboard_state(garage_id, version, page=1):
+    # version is only part of the cache key; it is bumped after every write
+    return get_garage_dashboard_state(garage_id, limit=GARAGE_JOBS_PAGE_SIZE,
+                                      offset=(page - 1) * GARAGE_JOBS_PAGE_SIZE)
+
+def _bump_garage_version():
+    st.session_state['_garage_version'] = st.session_state.get('_garage_version', 0) + 1
+
+def _sorted_parts(parts_df, column):
+    """parts_df sorted by a numeric column, reused while parts_df is unchanged"""
+    if not is_numeric_dtype(parts_df[column]):
+        return parts_df
+    cache = st.session_state.get('_sorted_cache')
+    if cache is None or cache['source'] is not parts_df:
+        cache = st.session_state['_sorted_cache'] = {'source': parts_df, 'frames': {}}
+    if column not in cache['frames']:
+        cache['frames'][column] = parts_df.sort_values(column)
+    return cache['frames'][column]
+
+@st.fragment
+def _chart_fragment(parts_df, all_cols, num_cols):
+    """Chart settings and output; reruns on its own when the chart widgets change"""
+    default_x = all_cols.index('part_name') if 'part_name' in all_cols else 0
+    default_y = num_cols.index('oem_price') if 'oem_price' in num_cols else 0
+    
+    st.markdown("#### 📊 Convert Tabular Data to Visualization")
+    
+    with st.expander("Chart Settings", expanded=True):
+        col_v1, col_v2, col_v3 = st.columns(3)
+        with col_v1:
+            chart_type = st.selectbox("Chart Type", ["Bar Chart", "Pie Chart", "Line Chart", "Scatter Plot"])
+        with col_v2:
+            x_axis = st.selectbox("X-Axis", all_cols, index=default_x)
+        with col_v3:
+            y_axis = st.selectbox("Y-Axis", num_cols, index=default_y)
+    
+    if st.button("🔄 Generate Chart", type="secondary"):
+        st.markdown("### 📈 Visualization Output")
+        
+        try:
+            if chart_type == "Bar Chart":
+                fig = px.bar(parts_df.head(20), x=x_axis, y=y_axis, 
+                            title=f"{y_axis} by {x_axis} (Top 20)",
+                            color=y_axis, color_continuous_scale='Viridis',
+                            hover_data=PARTS_HOVER_COLUMNS)
+                fig.update_xaxes(tickangle=45)
+                
+            elif chart_type == "Pie Chart":
+                fig = px.pie(parts_df.head(10), names=x_axis, values=y_axis, 
+                            title=f"Distribution of {y_axis} by {x_axis} (Top 10)",
+                            hole=0.3)
+                
+            elif chart_type == "Line Chart":
+                parts_sorted = _sorted_parts(parts_df, x_axis)
+                fig = px.line(parts_sorted.head(15), x=x_axis, y=y_axis, 
+                             title=f"{y_axis} Trend by {x_axis}",
+                             markers=True)
+                
+            elif chart_type == "Scatter Plot":
+                size_col = 'stock_quantity' if 'stock_quantity' in parts_df.columns else y_axis
+                fig = px.scatter(parts_df, x=x_axis, y=y_axis, 
+                                size=size_col, color=y_axis,
+                                title=f"{y_axis} vs {x_axis}",
+                                hover_data=PARTS_HOVER_COLUMNS,
+                                size_max=30,
+                                render_mode='webgl')
+            
+            fig.update_layout(height=500, hovermode='x unified', uirevision='parts')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Chart statistics
+            stats = parts_df[y_axis].agg(['mean', 'min', 'max'])
+            col_stats1, col_stats2, col_stats3 = st.columns(3)
+            with col_stats1:
+                st.metric(f"Avg {y_axis}", f"₹{stats['mean']:.2f}")
+            with col_stats2:
+                st.metric(f"Min {y_axis}", f"₹{stats['min']:.2f}")
+            with col_stats3:
+                st.metric(f"Max {y_axis}", f"₹{stats['max']:.2f}")
+                
+        except Exception as e:
+            st.error(f"Error generating chart: {str(e)}")
+            st.info("Please select appropriate columns for the chart type.")
+
+@st.fragment
+def _search_fragment(parts_df, parts_search):
+    """Part search; reruns on its own as the search term changes"""
+    st.markdown("---")
+    st.markdown("#### 🔍 Search Specific Part")
+    search_term = st.text_input("Enter part name or number", key='part_search').strip()
+    
+    if len(search_term) == 1:
+        st.caption("Type at least 2 characters to search")
+    elif search_term:
+        # Plain substring match against the pre-lowercased columns
+        term = search_term.lower()
+        mask = (parts_search['name'].str.contains(term, regex=False, na=False) |
+                parts_search['number'].str.contains(term, regex=False, na=False))
+        search_results = parts_df[mask]
+        
+        if not search_results.empty:
+            st.success(f"Found {len(search_results)} matching parts")
+            st.markdown("\n".join(f"""
+                <div class="part-card">
+                    <h4>{part.part_name} ({part.part_number})</h4>
+                    <p><strong>Make:</strong> {part.make} | <strong>Model:</strong> {part.model}</p>
+                    <p><strong>OEM Price:</strong> ₹{part.oem_price:,.2f} | 
+                       <strong>Market Price:</strong> ₹{part.aftermarket_price:,.2f}</p>
+                    <p><strong>Stock:</strong> {part.stock_quantity} units | 
+                       <strong>Lead Time:</strong> {part.lead_time_days} days</p>
+                </div>
+                """ for part in search_results.itertuples(index=False)), unsafe_allow_html=True)
+        else:
+            st.warning("No parts found matching your search")
+
 def render_parts_catalog():
     st.markdown("## 🔧 Parts Catalog & Pricing")
     
@@ -794,107 +1019,39 @@ def render_parts_catalog():
     with col1:
         make_filter = st.selectbox("Vehicle Make", ["All", "Hero", "Mahindra"])
     with col2:
-        category_filter = st.selectbox("Category", ["All", "Engine", "Electrical", "Brakes", 
-                                                   "Tires", "Suspension", "Cooling"])
+        category_filter = st.selectbox("Category", PART_CATEGORY_FILTERS)
     with col3:
-        sort_by = st.selectbox("Sort By", ["Price (Low to High)", "Price (High to Low)", 
-                                          "Name", "Stock", "Lead Time"])
+        sort_by = st.selectbox("Sort By", list(PARTS_SORT_OPTIONS.keys()))
     
     make = None if make_filter == "All" else make_filter
     category = None if category_filter == "All" else category_filter
     
-    parts = get_parts_catalog(make=make, category=category)
+    # Sorting happens in SQL; rows come back column-wise
+    parts = _cached_parts(make, category, sort_by)
     
-    if parts:
+    if parts['part_number']:
+        # Built from the cached rows on each run, so stock changes show up once _cached_parts is cleared or expires
         parts_df = pd.DataFrame(parts)
+        parts_search = pd.DataFrame({
+            'name': parts_df['part_name'].str.lower(),
+            'number': parts_df['part_number'].str.lower()
+        })
+        all_cols = parts_df.columns.tolist()
+        num_cols = parts_df.select_dtypes(include='number').columns.tolist()
         
-        # Apply sorting
-        if sort_by == "Price (Low to High)":
-            parts_df = parts_df.sort_values('oem_price')
-        elif sort_by == "Price (High to Low)":
-            parts_df = parts_df.sort_values('oem_price', ascending=False)
-        elif sort_by == "Name":
-            parts_df = parts_df.sort_values('part_name')
-        elif sort_by == "Stock":
-            parts_df = parts_df.sort_values('stock_quantity', ascending=False)
-        elif sort_by == "Lead Time":
-            parts_df = parts_df.sort_values('lead_time_days')
-        
-        st.markdown(f"### 📦 Found {len(parts)} Parts")
+        st.markdown(f"### 📦 Found {len(parts_df)} Parts")
         
         # Data to Visualization Feature
-        st.markdown("#### 📊 Convert Tabular Data to Visualization")
-        
-        with st.expander("Chart Settings", expanded=True):
-            col_v1, col_v2, col_v3 = st.columns(3)
-            with col_v1:
-                chart_type = st.selectbox("Chart Type", ["Bar Chart", "Pie Chart", "Line Chart", "Scatter Plot"])
-            with col_v2:
-                available_columns = parts_df.select_dtypes(include=['number']).columns.tolist()
-                x_axis = st.selectbox("X-Axis", parts_df.columns.tolist(), 
-                                     index=parts_df.columns.tolist().index('part_name') if 'part_name' in parts_df.columns else 0)
-            with col_v3:
-                y_axis = st.selectbox("Y-Axis", available_columns, 
-                                     index=available_columns.index('oem_price') if 'oem_price' in available_columns else 0)
-        
-        if st.button("🔄 Generate Chart", type="secondary"):
-            st.markdown("### 📈 Visualization Output")
-            
-            try:
-                if chart_type == "Bar Chart":
-                    fig = px.bar(parts_df.head(20), x=x_axis, y=y_axis, 
-                                title=f"{y_axis} by {x_axis} (Top 20)",
-                                color=y_axis, color_continuous_scale='Viridis',
-                                hover_data=parts_df.columns.tolist())
-                    fig.update_xaxes(tickangle=45)
-                    
-                elif chart_type == "Pie Chart":
-                    fig = px.pie(parts_df.head(10), names=x_axis, values=y_axis, 
-                                title=f"Distribution of {y_axis} by {x_axis} (Top 10)",
-                                hole=0.3)
-                    
-                elif chart_type == "Line Chart":
-                    parts_sorted = parts_df.sort_values(x_axis) if parts_df[x_axis].dtype in ['int64', 'float64'] else parts_df
-                    fig = px.line(parts_sorted.head(15), x=x_axis, y=y_axis, 
-                                 title=f"{y_axis} Trend by {x_axis}",
-                                 markers=True)
-                    
-                elif chart_type == "Scatter Plot":
-                    size_col = 'stock_quantity' if 'stock_quantity' in parts_df.columns else y_axis
-                    fig = px.scatter(parts_df, x=x_axis, y=y_axis, 
-                                    size=size_col, color=y_axis,
-                                    title=f"{y_axis} vs {x_axis}",
-                                    hover_data=parts_df.columns.tolist(),
-                                    size_max=30)
-                
-                fig.update_layout(height=500, hovermode='x unified')
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Chart statistics
-                col_stats1, col_stats2, col_stats3 = st.columns(3)
-                with col_stats1:
-                    st.metric(f"Avg {y_axis}", f"₹{parts_df[y_axis].mean():.2f}")
-                with col_stats2:
-                    st.metric(f"Min {y_axis}", f"₹{parts_df[y_axis].min():.2f}")
-                with col_stats3:
-                    st.metric(f"Max {y_axis}", f"₹{parts_df[y_axis].max():.2f}")
-                    
-            except Exception as e:
-                st.error(f"Error generating chart: {str(e)}")
-                st.info("Please select appropriate columns for the chart type.")
+        _chart_fragment(parts_df, all_cols, num_cols)
         
         st.markdown("---")
         
         # Parts Table
         st.markdown("#### Parts Details Table")
         
-        # Create formatted display
-        display_df = parts_df.copy()
-        display_df['oem_price'] = display_df['oem_price'].apply(lambda x: f"₹{x:,.2f}")
-        display_df['aftermarket_price'] = display_df['aftermarket_price'].apply(lambda x: f"₹{x:,.2f}" if pd.notnull(x) else "N/A")
-        
+        # Prices are formatted by the column config, not in pandas
         st.dataframe(
-            display_df,
+            parts_df,
             column_config={
                 "part_number": st.column_config.TextColumn(
                     "Part No.",
@@ -904,11 +1061,13 @@ def render_parts_catalog():
                     "Part Name",
                     width="medium"
                 ),
-                "oem_price": st.column_config.TextColumn(
-                    "OEM Price"
+                "oem_price": st.column_config.NumberColumn(
+                    "OEM Price",
+                    format="₹%.2f"
                 ),
-                "aftermarket_price": st.column_config.TextColumn(
-                    "Market Price"
+                "aftermarket_price": st.column_config.NumberColumn(
+                    "Market Price",
+                    format="₹%.2f"
                 ),
                 "stock_quantity": st.column_config.NumberColumn(
                     "In Stock",
@@ -926,8 +1085,7 @@ def render_parts_catalog():
         # Price Comparison Chart
         st.markdown("#### Price Comparison Chart")
         
-        top_parts = parts_df.head(8).copy()
-        top_parts['savings'] = top_parts['oem_price'] - top_parts['aftermarket_price']
+        top_parts = parts_df.head(8)
         
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -952,26 +1110,34 @@ def render_parts_catalog():
             barmode='group',
             height=500,
             hovermode='x unified',
-            xaxis_tickangle=45
+            xaxis_tickangle=45,
+            uirevision='parts'
         )
         
         st.plotly_chart(fig, use_container_width=True)
         
-        # Savings analysis
-        st.markdown("##### 💰 Potential Savings with Aftermarket Parts")
-        savings_df = parts_df.copy()
-        savings_df['savings_percent'] = ((savings_df['oem_price'] - savings_df['aftermarket_price']) / savings_df['oem_price'] * 100).round(1)
-        savings_df['savings_amount'] = (savings_df['oem_price'] - savings_df['aftermarket_price']).round(2)
-        
-        top_savings = savings_df.nlargest(5, 'savings_amount')
-        
-        for _, part in top_savings.iterrows():
-            col_s1, col_s2 = st.columns([3, 1])
-            with col_s1:
-                st.write(f"**{part['part_name']}**: Save ₹{part['savings_amount']:.2f} ({part['savings_percent']}%)")
-            with col_s2:
-                if st.button("View Details", key=f"view_{part['part_number']}"):
-                    st.session_state['selected_part'] = part['part_number']
+        # Savings analysis (savings columns come from get_parts_catalog)
+        if parts_df['savings_amount'].notna().any():
+            st.markdown("##### 💰 Potential Savings with Aftermarket Parts")
+            top_savings = parts_df.nlargest(5, 'savings_amount')
+            
+            savings_event = st.dataframe(
+                top_savings[['part_name', 'savings_amount', 'savings_percent']],
+                column_config={
+                    "part_name": st.column_config.TextColumn("Part Name"),
+                    "savings_amount": st.column_config.NumberColumn("Save", format="₹%.2f"),
+                    "savings_percent": st.column_config.NumberColumn("Save %", format="%.1f%%")
+                },
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                # Keyed on the filters so a selection never carries over to a different set of rows
+                key=f"savings_table_{make_filter}_{category_filter}"
+            )
+            selected_rows = [i for i in savings_event.selection.rows if i < len(top_savings)]
+            if selected_rows:
+                st.session_state['selected_part'] = top_savings.iloc[selected_rows[0]]['part_number']
         
         # Download option
         csv = parts_df.to_csv(index=False)
@@ -983,31 +1149,7 @@ def render_parts_catalog():
         )
         
         # Search specific part
-        st.markdown("---")
-        st.markdown("#### 🔍 Search Specific Part")
-        search_term = st.text_input("Enter part name or number")
-        
-        if search_term:
-            search_results = parts_df[
-                parts_df['part_name'].str.contains(search_term, case=False) | 
-                parts_df['part_number'].str.contains(search_term, case=False)
-            ]
-            
-            if not search_results.empty:
-                st.success(f"Found {len(search_results)} matching parts")
-                for _, part in search_results.iterrows():
-                    st.markdown(f"""
-                    <div class="part-card">
-                        <h4>{part['part_name']} ({part['part_number']})</h4>
-                        <p><strong>Make:</strong> {part['make']} | <strong>Model:</strong> {part['model']}</p>
-                        <p><strong>OEM Price:</strong> ₹{part['oem_price']:,.2f} | 
-                           <strong>Market Price:</strong> ₹{part['aftermarket_price']:,.2f}</p>
-                        <p><strong>Stock:</strong> {part['stock_quantity']} units | 
-                           <strong>Lead Time:</strong> {part['lead_time_days']} days</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.warning("No parts found matching your search")
+        _search_fragment(parts_df, parts_search)
     else:
         st.info("No parts found matching your criteria.")
 # Add to app.py - After other render functions, before main()
@@ -1015,40 +1157,8 @@ def render_parts_catalog():
 def render_garage_dashboard():
     st.markdown("# 🛠️ Garage Dashboard")
     
-    # Helper function to get garages
-    def get_all_garages_safe():
-        from database import get_db_connection
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM garages ORDER BY name")
-            return [dict(row) for row in cursor.fetchall()]
-    
-    def get_breakdowns_for_garage_safe(garage_id):
-        from database import get_db_connection
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT b.*, v.make, v.model, v.year, v.owner_name, v.owner_phone, v.vin
-                FROM breakdown_incidents b
-                JOIN vehicles v ON b.vehicle_id = v.id
-                WHERE b.garage_id = ? 
-                ORDER BY b.reported_at DESC
-            ''', (garage_id,))
-            return [dict(row) for row in cursor.fetchall()]
-    
-    def update_breakdown_status_safe(incident_id, status):
-        from database import get_db_connection
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE breakdown_incidents 
-                SET status = ?
-                WHERE id = ?
-            ''', (status, incident_id))
-            conn.commit()
-    
     # Get all garages
-    garages = get_all_garages_safe()
+    garages = _cached_all_garages()
     
     if not garages:
         st.warning("No garages found in database.")
@@ -1072,9 +1182,9 @@ def render_garage_dashboard():
         # Show all garages
         st.markdown("### Available Garages")
         cols = st.columns(2)
+        garage_cards = ([], [])
         for idx, garage in enumerate(garages):
-            with cols[idx % 2]:
-                st.markdown(f"""
+            garage_cards[idx % 2].append(f"""
                 <div style='border: 1px solid #ddd; padding: 15px; border-radius: 10px; margin: 10px 0;'>
                     <h4>🏢 {garage['name']}</h4>
                     <p><strong>📍</strong> {garage['address']}</p>
@@ -1083,31 +1193,31 @@ def render_garage_dashboard():
                     <p><strong>⏱️</strong> {garage['estimated_response_time']} min response</p>
                     <p><strong>📊</strong> {garage['current_load']}/{garage['capacity']} jobs</p>
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+        for col, cards in zip(cols, garage_cards):
+            col.markdown("\n".join(cards), unsafe_allow_html=True)
         return
     
     # Garage is logged in - show dashboard
     garage_id = st.session_state['garage_id']
     garage_name = st.session_state['garage_name']
     
-    def get_garage_by_id_safe(garage_id):
-        from database import get_db_connection
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM garages WHERE id = ?", (garage_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
-    
-    garage = get_garage_by_id_safe(garage_id)
+    # Garage, jobs and status counts come from one cached query batch
+    dashboard_state = load_garage_dashboard_state(
+        garage_id,
+        st.session_state.get('_garage_version', 0),
+        st.session_state.get('garage_jobs_page', 1)
+    )
+    garage = dashboard_state['garage']
     if not garage:
         st.error("Garage not found!")
         del st.session_state['garage_id']
         st.rerun()
     
-    # Get breakdowns for this garage
-    breakdowns = get_breakdowns_for_garage_safe(garage_id)
-    active_jobs = [b for b in breakdowns if b['status'] in ['assigned', 'in_progress']]
-    completed_jobs = [b for b in breakdowns if b['status'] == 'completed']
+    breakdowns = dashboard_state['breakdowns']
+    status_counts = dashboard_state['status_counts']
+    active_job_count = status_counts.get('assigned', 0) + status_counts.get('in_progress', 0)
+    total_jobs = sum(status_counts.values())
     
     # Header
     st.markdown(f"## 🏢 {garage_name}")
@@ -1115,9 +1225,9 @@ def render_garage_dashboard():
     # Stats row
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Active Jobs", len(active_jobs))
+        st.metric("Active Jobs", active_job_count)
     with col2:
-        st.metric("Total Jobs", len(breakdowns))
+        st.metric("Total Jobs", total_jobs)
     with col3:
         st.metric("Capacity", f"{garage['current_load']}/{garage['capacity']}")
     with col4:
@@ -1133,15 +1243,47 @@ def render_garage_dashboard():
     st.markdown("---")
     
     # Tabs
-    tab1, tab2 = st.tabs(["📋 Active Jobs", "🏢 Garage Info"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        "📋 Active Jobs", "🏢 Garage Info", "🛠️ Repairs", "📦 Inventory", "👨‍🔧 Technicians", "📊 Analytics"
+    ])
     
     with tab1:
-        st.markdown(f"### Breakdown Jobs ({len(breakdowns)})")
+        st.markdown(f"### Breakdown Jobs ({total_jobs})")
+        
+        if total_jobs > GARAGE_JOBS_PAGE_SIZE:
+            st.number_input("Page", min_value=1, max_value=math.ceil(total_jobs / GARAGE_JOBS_PAGE_SIZE),
+                            value=1, key="garage_jobs_page")
         
         if not breakdowns:
             st.info("No jobs assigned to your garage.")
         else:
-            for job in breakdowns:
+            # One table widget for the job list; actions render for the selected job only
+            jobs_df = pd.DataFrame(breakdowns)
+            jobs_event = st.dataframe(
+                jobs_df[['id', 'breakdown_type', 'make', 'model', 'owner_name', 'status', 'reported_at']],
+                column_config={
+                    "id": st.column_config.NumberColumn("Job #", format="%d"),
+                    "breakdown_type": st.column_config.TextColumn("Breakdown"),
+                    "make": st.column_config.TextColumn("Make"),
+                    "model": st.column_config.TextColumn("Model"),
+                    "owner_name": st.column_config.TextColumn("Owner"),
+                    "status": st.column_config.TextColumn("Status"),
+                    "reported_at": st.column_config.TextColumn("Reported")
+                },
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                # Keyed per page so a selection never carries over to another page's rows
+                key=f"garage_jobs_table_{st.session_state.get('garage_jobs_page', 1)}"
+            )
+            
+            # A selection left over from a longer job list can point past the current rows
+            selected_rows = [i for i in jobs_event.selection.rows if i < len(breakdowns)]
+            if not selected_rows:
+                st.caption("Select a job to see its details and actions.")
+            else:
+                job = breakdowns[selected_rows[0]]
                 status_color = {
                     'reported': 'gray',
                     'assigned': 'orange',
@@ -1149,61 +1291,54 @@ def render_garage_dashboard():
                     'completed': 'green'
                 }.get(job['status'], 'gray')
                 
-                with st.expander(f"#{job['id']} - {job['breakdown_type']} - {job['make']} {job['model']}", expanded=False):
-                    col_a, col_b = st.columns(2)
-                    
-                    with col_a:
-                        st.write(f"**Vehicle:** {job['make']} {job['model']} ({job['year']})")
-                        st.write(f"**Owner:** {job['owner_name']}")
-                        st.write(f"**Phone:** {job['owner_phone']}")
-                        st.write(f"**VIN:** {job['vin']}")
-                    
-                    with col_b:
-                        st.write(f"**Status:** :{status_color}[{job['status'].replace('_', ' ').title()}]")
-                        st.write(f"**Reported:** {job['reported_at'][:16]}")
-                        st.write(f"**Est. Fix:** {job.get('estimated_fix_time', 'N/A')} mins")
+                st.markdown(f"#### #{job['id']} - {job['breakdown_type']} - {job['make']} {job['model']}")
+                
+                col_a, col_b = st.columns(2)
+                
+                with col_a:
+                    st.write(f"**Vehicle:** {job['make']} {job['model']} ({job['year']})")
+                    st.write(f"**Owner:** {job['owner_name']}")
+                    st.write(f"**Phone:** {job['owner_phone']}")
+                    st.write(f"**VIN:** {job['vin']}")
+                
+                with col_b:
+                    st.write(f"**Status:** :{status_color}[{job['status'].replace('_', ' ').title()}]")
+                    st.write(f"**Reported:** {job['reported_at'][:16]}")
+                    st.write(f"**Est. Fix:** {job.get('estimated_fix_time', 'N/A')} mins")
+                
+                # Action buttons
+                if job['status'] == 'assigned':
+                    col_x, col_y = st.columns(2)
+                    with col_x:
+                        if st.button("🛠️ Start Repair", key=f"start_{job['id']}"):
+                            update_breakdown_status(job['id'], 'in_progress')
+                            _bump_garage_version()
+                            st.success("Job status updated to 'In Progress'")
+                            st.rerun()
+                    with col_y:
+                        if st.button("📞 Call Customer", key=f"call_{job['id']}"):
+                            st.info(f"📱 Calling {job['owner_name']} at {job['owner_phone']}")
+                
+                elif job['status'] == 'in_progress':
+                    notes = st.text_area("Repair notes", key=f"notes_{job['id']}", placeholder="Describe what was fixed...")
                     
-                    # Action buttons
-                    if job['status'] == 'assigned':
-                        col_x, col_y = st.columns(2)
-                        with col_x:
-                            if st.button("🛠️ Start Repair", key=f"start_{job['id']}"):
-                                update_breakdown_status_safe(job['id'], 'in_progress')
-                                st.success("Job status updated to 'In Progress'")
-                                st.rerun()
-                        with col_y:
-                            if st.button("📞 Call Customer", key=f"call_{job['id']}"):
-                                st.info(f"📱 Calling {job['owner_name']} at {job['owner_phone']}")
+                    col_x, col_y = st.columns(2)
+                    with col_x:
+                        parts_cost = st.number_input("Parts Cost (₹)", min_value=0, value=500, key=f"parts_{job['id']}")
+                    with col_y:
+                        labor_cost = st.number_input("Labor Cost (₹)", min_value=0, value=1000, key=f"labor_{job['id']}")
                     
-                    elif job['status'] == 'in_progress':
-                        notes = st.text_area("Repair notes", key=f"notes_{job['id']}", placeholder="Describe what was fixed...")
+                    if st.button("✅ Mark as Completed", key=f"complete_{job['id']}", type="primary"):
+                        total_cost = parts_cost + labor_cost
                         
-                        col_x, col_y = st.columns(2)
-                        with col_x:
-                            parts_cost = st.number_input("Parts Cost (₹)", min_value=0, value=500, key=f"parts_{job['id']}")
-                        with col_y:
-                            labor_cost = st.number_input("Labor Cost (₹)", min_value=0, value=1000, key=f"labor_{job['id']}")
+                        # Update the breakdown record
+                        mark_breakdown_completed(job['id'], total_cost)
+                        _bump_garage_version()
                         
-                        if st.button("✅ Mark as Completed", key=f"complete_{job['id']}", type="primary"):
-                            total_cost = parts_cost + labor_cost
-                            
-                            # Update the breakdown record
-                            from database import get_db_connection
-                            import json
-                            with get_db_connection() as conn:
-                                cursor = conn.cursor()
-                                cursor.execute('''
-                                    UPDATE breakdown_incidents 
-                                    SET status = 'completed', 
-                                        total_cost = ?
-                                    WHERE id = ?
-                                ''', (total_cost, job['id']))
-                                conn.commit()
-                            
-                            st.success(f"Job completed! Total: ₹{total_cost}")
-                            st.balloons()
-                            st.rerun()
-    
+                        st.success(f"Job completed! Total: ₹{total_cost}")
+                        st.balloons()
+                        st.rerun()
+
     with tab2:
         st.markdown("### Garage Information")
         
@@ -1233,17 +1368,23 @@ def render_garage_dashboard():
             st.markdown("#### Update Capacity")
             new_capacity = st.number_input("New Capacity", min_value=1, max_value=50, value=garage['capacity'])
             if st.button("Update Capacity"):
-                from database import get_db_connection
-                with get_db_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        UPDATE garages 
-                        SET capacity = ?
-                        WHERE id = ?
-                    ''', (new_capacity, garage_id))
-                    conn.commit()
+                update_garage_capacity(garage_id, new_capacity)
+                _cached_all_garages.clear()
+                _bump_garage_version()
                 st.success("Garage capacity updated!")
                 st.rerun()
+    
+    with tab3:
+        render_active_jobs_tab(garage_id, garage_name)
+    
+    with tab4:
+        render_parts_inventory_tab(garage_id)
+    
+    with tab5:
+        render_technicians_tab(garage_id)
+    
+    with tab6:
+        render_garage_analytics_tab(garage_id)
 
 def render_active_jobs_tab(garage_id, garage_name):
     st.markdown(f"### 🚧 Active Breakdowns - {garage_name}")
@@ -1255,6 +1396,9 @@ def render_active_jobs_tab(garage_id, garage_name):
         st.info("No active breakdowns assigned to your garage.")
         return
     
+    # Parts lookups are shared by every in-progress job of the same make
+    parts_by_make = {}
+    
     for breakdown in breakdowns:
         status_color = {
             'assigned': 'warning',
@@ -1288,10 +1432,11 @@ def render_active_jobs_tab(garage_id, garage_name):
                 with col_a:
                     if st.button("🚗 Dispatch Technician", key=f"dispatch_{breakdown['id']}"):
                         start_breakdown_fix(breakdown['id'])
+                        _bump_garage_version()
                         st.success("Job status updated to 'In Progress'")
                         st.rerun()
                 with col_b:
-                    if st.button("📞 Call Customer", key=f"call_{breakdown['id']}"):
+                    if st.button("📞 Call Customer", key=f"repair_call_{breakdown['id']}"):
                         st.info(f"Calling {breakdown['owner_name']} at {breakdown['owner_phone']}")
                 with col_c:
                     if st.button("🗺️ Get Directions", key=f"dir_{breakdown['id']}"):
@@ -1306,31 +1451,37 @@ def render_active_jobs_tab(garage_id, garage_name):
                 
                 # Parts used
                 st.subheader("📦 Parts Used")
-                available_parts = get_parts_catalog(make=breakdown['make'])
+                if breakdown['make'] not in parts_by_make:
+                    parts_by_make[breakdown['make']] = {
+                        p['part_number']: p for p in get_parts_catalog(make=breakdown['make'])
+                    }
+                parts_by_pn = parts_by_make[breakdown['make']]
                 
                 selected_parts = st.multiselect(
                     "Select parts used",
-                    [f"{p['part_number']} - {p['part_name']} (₹{p['aftermarket_price']})" for p in available_parts],
-                    key=f"parts_{breakdown['id']}"
+                    options=list(parts_by_pn),
+                    format_func=lambda pn: f"{pn} - {parts_by_pn[pn]['part_name']} (₹{parts_by_pn[pn]['aftermarket_price']})",
+                    key=f"repair_parts_{breakdown['id']}"
                 )
                 
                 # Labor cost
-                labor_hours = st.number_input("Labor Hours", min_value=0.5, max_value=10.0, value=2.0, step=0.5, key=f"labor_{breakdown['id']}")
+                labor_hours = st.number_input("Labor Hours", min_value=0.5, max_value=10.0, value=2.0, step=0.5, key=f"repair_labor_{breakdown['id']}")
                 hourly_rate = st.number_input("Hourly Rate (₹)", min_value=500, max_value=2000, value=800, key=f"rate_{breakdown['id']}")
                 
                 # Notes
-                technician_notes = st.text_area("Technician Notes", placeholder="Describe the issue and fix applied...", key=f"notes_{breakdown['id']}")
+                technician_notes = st.text_area("Technician Notes", placeholder="Describe the issue and fix applied...", key=f"repair_notes_{breakdown['id']}")
                 
                 col_x, col_y = st.columns(2)
                 with col_x:
                     if st.button("⏸️ Pause Job", key=f"pause_{breakdown['id']}"):
                         update_breakdown_status(breakdown['id'], 'on_hold', technician_notes)
+                        _bump_garage_version()
                         st.warning("Job paused")
                         st.rerun()
                 with col_y:
-                    if st.button("✅ Complete Job", type="primary", key=f"complete_{breakdown['id']}"):
+                    if st.button("✅ Complete Job", type="primary", key=f"repair_complete_{breakdown['id']}"):
                         # Calculate total cost
-                        parts_cost = sum(float(p.split('₹')[1].split(')')[0]) for p in selected_parts)
+                        parts_cost = sum(parts_by_pn[pn]['aftermarket_price'] for pn in selected_parts)
                         labor_cost = labor_hours * hourly_rate
                         total_cost = parts_cost + labor_cost
                         
@@ -1338,151 +1489,253 @@ def render_active_jobs_tab(garage_id, garage_name):
                         actual_time = st.number_input("Actual Fix Time (minutes)", min_value=15, max_value=480, value=breakdown.get('estimated_fix_time', 60), key=f"time_{breakdown['id']}")
                         
                         # Record completion
-                        parts_used = []
-                        for part_str in selected_parts:
-                            part_num = part_str.split(' - ')[0]
-                            parts_used.append({
-                                'part_number': part_num,
-                                'quantity': 1,
-                                'price': float(part_str.split('₹')[1].split(')')[0])
-                            })
-                        
-                        complete_breakdown_fix(
-                            incident_id=breakdown['id'],
-                            parts_used=parts_used,
-                            total_cost=total_cost,
-                            actual_fix_time=actual_time,
-                            notes=technician_notes
-                        )
+                        parts_used = [
+                            {'part_number': pn, 'quantity': 1, 'price': parts_by_pn[pn]['aftermarket_price']}
+                            for pn in selected_parts
+                        ]
                         
-                        # Update inventory
-                        use_parts_for_breakdown(breakdown['id'], parts_used)
+                        # Update inventory first: it fails as a whole on short stock, before the job is closed
+                        try:
+                            use_parts_for_breakdown(breakdown['id'], parts_used)
+                        except ValueError as e:
+                            st.error(f"Cannot complete job: {e}")
+                        else:
+                            _inventory_parts_df.clear()
+                            _cached_parts.clear()
+                            _bump_garage_version()
+                            complete_breakdown_fix(
+                                incident_id=breakdown['id'],
+                                parts_used=parts_used,
+                                total_cost=total_cost,
+                                actual_fix_time=actual_time,
+                                notes=technician_notes
+                            )
                         
-                        # Generate invoice
-                        invoice = generate_breakdown_invoice(breakdown['id'])
+                            # Generate invoice
+                            invoice = generate_breakdown_invoice(breakdown['id'])
                         
-                        st.success(f"Job completed! Total cost: ₹{total_cost:.2f}")
-                        st.balloons()
+                            st.success(f"Job completed! Total cost: ₹{total_cost:.2f}")
+                            st.balloons()
                         
-                        # Show invoice
-                        with st.expander("📄 View Invoice"):
-                            st.json(invoice)
+                            # Show invoice
+                            with st.expander("📄 View Invoice"):
+                                st.json(invoice)
                         
-                        st.rerun()
+                            st.rerun()
+
+INVENTORY_PAGE_SIZE = 20
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _inventory_parts_df():
+    parts_df = pd.DataFrame(get_parts_catalog_columns())
+    # Name and number lowercased into one field at load, so a search is a single substring pass
+    parts_df['_search_lc'] = parts_df['part_name'].str.lower() + '\n' + parts_df['part_number'].str.lower()
+    return parts_df
 
 def render_parts_inventory_tab(garage_id):
     st.markdown("### 📦 Parts Inventory Management")
     
     # Get all parts
-    parts = get_parts_catalog()
+    parts_df = _inventory_parts_df()
     
     # Filter and search
     col1, col2 = st.columns(2)
     with col1:
         search_term = st.text_input("Search parts")
     with col2:
-        category_filter = st.selectbox("Filter by category", ["All", "Engine", "Electrical", "Brakes", "Tires", "Suspension", "Cooling"])
+        category_filter = st.selectbox("Filter by category", PART_CATEGORY_FILTERS)
     
-    # Filter parts
-    filtered_parts = parts
+    # Filter parts with one vectorized mask
+    mask = pd.Series(True, index=parts_df.index)
     if search_term:
-        filtered_parts = [p for p in parts if search_term.lower() in p['part_name'].lower() or search_term in p['part_number']]
+        mask &= parts_df['_search_lc'].str.contains(search_term.lower(), regex=False, na=False)
     if category_filter != "All":
-        filtered_parts = [p for p in filtered_parts if p['category'] == category_filter]
+        mask &= parts_df['category'] == category_filter
+    filtered_df = parts_df[mask]
     
     # Low stock warning
-    low_stock = [p for p in filtered_parts if p['stock_quantity'] < 5]
-    if low_stock:
+    low_stock = filtered_df[filtered_df['stock_quantity'] < 5]
+    if not low_stock.empty:
         st.warning(f"⚠️ {len(low_stock)} parts are low on stock!")
-        for part in low_stock[:3]:
-            st.write(f"• {part['part_name']} - Only {part['stock_quantity']} left")
+        for part in low_stock.head(3).itertuples(index=False):
+            st.write(f"• {part.part_name} - Only {part.stock_quantity} left")
+    
+    # One table per page of parts; stock widgets render for the selected part only
+    page = 1
+    if len(filtered_df) > INVENTORY_PAGE_SIZE:
+        page = st.number_input("Page", min_value=1, max_value=math.ceil(len(filtered_df) / INVENTORY_PAGE_SIZE),
+                               value=1, key="inventory_page")
+    display_df = filtered_df.iloc[(page - 1) * INVENTORY_PAGE_SIZE:page * INVENTORY_PAGE_SIZE]
+    parts_event = st.dataframe(
+        display_df[['part_number', 'part_name', 'category', 'make', 'model',
+                    'oem_price', 'aftermarket_price', 'stock_quantity', 'lead_time_days']],
+        column_config={
+            "part_number": st.column_config.TextColumn("Part No."),
+            "part_name": st.column_config.TextColumn("Part Name"),
+            "category": st.column_config.TextColumn("Category"),
+            "make": st.column_config.TextColumn("Make"),
+            "model": st.column_config.TextColumn("Model"),
+            "oem_price": st.column_config.NumberColumn("OEM Price", format="₹%.2f"),
+            "aftermarket_price": st.column_config.NumberColumn("Market Price", format="₹%.2f"),
+            "stock_quantity": st.column_config.NumberColumn("In Stock"),
+            "lead_time_days": st.column_config.NumberColumn("Lead Days")
+        },
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        # Keyed on the page and filters so a selection never carries over to a different set of rows
+        key=f"inventory_table_{page}_{category_filter}_{search_term}"
+    )
     
-    # Display parts in a nice grid
-    for part in filtered_parts[:20]:  # Limit to first 20
-        with st.expander(f"{part['part_name']} ({part['part_number']}) - Stock: {part['stock_quantity']}"):
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.write(f"**Category:** {part['category']}")
-                st.write(f"**Make:** {part['make']}")
-                st.write(f"**Model:** {part['model']}")
-                st.write(f"**Years:** {part['year_from']}-{part['year_to']}")
-            with col_b:
-                st.write(f"**OEM Price:** ₹{part['oem_price']:.2f}")
-                st.write(f"**Market Price:** ₹{part['aftermarket_price']:.2f}")
-                st.write(f"**Lead Time:** {part['lead_time_days']} days")
-            
-            # Stock management
-            col_x, col_y, col_z = st.columns([2, 1, 1])
-            with col_x:
-                new_stock = st.number_input("Update stock quantity", min_value=0, value=part['stock_quantity'], key=f"stock_{part['id']}")
-            with col_y:
-                if st.button("Update", key=f"update_{part['id']}"):
-                    quantity_change = new_stock - part['stock_quantity']
-                    if update_part_stock(part['id'], quantity_change):
-                        st.success("Stock updated!")
-                        st.rerun()
-            with col_z:
-                if st.button("Reorder", key=f"reorder_{part['id']}"):
-                    st.info(f"Reorder request sent for {part['part_name']}")
+    selected_rows = [i for i in parts_event.selection.rows if i < len(display_df)]
+    if not selected_rows:
+        st.caption("Select a part to update its stock.")
+        return
+    
+    part = display_df.iloc[selected_rows[:1]].to_dict('records')[0]
+    st.markdown(f"#### {part['part_name']} ({part['part_number']})")
+    st.write(f"**Years:** {part['year_from']}-{part['year_to']}")
+    
+    # Stock management
+    col_x, col_y, col_z = st.columns([2, 1, 1])
+    with col_x:
+        st.number_input("Update stock quantity", min_value=0, value=part['stock_quantity'], key=f"stock_{part['id']}")
+    with col_y:
+        st.button("Update", key=f"update_{part['id']}", on_click=_update_stock,
+                  args=(part['id'], part['stock_quantity']))
+    with col_z:
+        if st.button("Reorder", key=f"reorder_{part['id']}"):
+            st.info(f"Reorder request sent for {part['part_name']}")
+
+# Mutations run as widget callbacks, before the rerun they trigger, so that single
+# rerun already sees the cleared caches and no extra st.rerun() is needed
+def _update_stock(part_id, current_stock):
+    quantity_change = st.session_state[f"stock_{part_id}"] - current_stock
+    if update_part_stock(part_id, quantity_change):
+        _inventory_parts_df.clear()
+        _cached_parts.clear()
+        st.toast("Stock updated!")
+
+def _add_technician(garage_id):
+    tech_name = st.session_state['new_tech_name']
+    contact = st.session_state['new_tech_contact']
+    if tech_name and contact:
+        create_technician(garage_id, tech_name, st.session_state['new_tech_specialization'],
+                          contact, st.session_state['new_tech_experience'])
+        _cached_techs.clear()
+        st.toast(f"Technician {tech_name} added!")
+
+def _assign_technician(tech_id, tech_name, job_options):
+    selected_job = st.session_state[f"assign_{tech_id}"]
+    assign_technician(job_options[selected_job], tech_id)
+    _cached_techs.clear()
+    st.toast(f"Assigned {tech_name} to {selected_job}")
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_techs(garage_id):
+    return get_garage_technicians(garage_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_garage_analytics(garage_id):
+    return get_garage_analytics(garage_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_garage_feedback(garage_id):
+    return get_garage_feedback(garage_id)
 
 def render_technicians_tab(garage_id):
     st.markdown("### 👨‍🔧 Technician Management")
     
     # Get technicians
-    technicians = get_garage_technicians(garage_id)
+    technicians = _cached_techs(garage_id)
     
     # Add new technician
     with st.form("add_technician_form"):
         st.markdown("#### Add New Technician")
         col1, col2 = st.columns(2)
         with col1:
-            tech_name = st.text_input("Name")
-            specialization = st.selectbox("Specialization", ["General", "Engine", "Electrical", "Brakes", "Transmission", "AC"])
+            st.text_input("Name", key="new_tech_name")
+            st.selectbox("Specialization", TECHNICIAN_SPECIALIZATIONS, key="new_tech_specialization")
         with col2:
-            contact = st.text_input("Contact Number")
-            experience = st.number_input("Experience (years)", min_value=0, max_value=50, value=3)
+            st.text_input("Contact Number", key="new_tech_contact")
+            st.number_input("Experience (years)", min_value=0, max_value=50, value=3, key="new_tech_experience")
         
-        if st.form_submit_button("➕ Add Technician"):
-            if tech_name and contact:
-                create_technician(garage_id, tech_name, specialization, contact, experience)
-                st.success(f"Technician {tech_name} added!")
-                st.rerun()
+        st.form_submit_button("➕ Add Technician", on_click=_add_technician, args=(garage_id,))
     
     # Display technicians
     st.markdown("#### Current Technicians")
     if technicians:
-        cols = st.columns(3)
-        for idx, tech in enumerate(technicians):
-            with cols[idx % 3]:
-                status_color = "green" if tech['status'] == 'available' else "red" if tech['status'] == 'busy' else "gray"
-                st.markdown(f"""
-                <div style='border: 1px solid #ddd; padding: 10px; border-radius: 5px; margin: 5px 0;'>
-                    <h4>👨‍🔧 {tech['name']}</h4>
-                    <p><strong>Status:</strong> <span style='color:{status_color}'>{tech['status'].title()}</span></p>
-                    <p><strong>Specialization:</strong> {tech['specialization']}</p>
-                    <p><strong>Contact:</strong> {tech['contact']}</p>
-                    <p><strong>Exp:</strong> {tech.get('experience_years', 0)} years</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Assign to breakdown if available
-                if tech['status'] == 'available':
-                    active_jobs = get_breakdowns_by_garage_and_status(garage_id, ['assigned'])
-                    if active_jobs:
-                        job_options = {f"#{j['id']} - {j['make']} {j['model']}": j['id'] for j in active_jobs}
-                        selected_job = st.selectbox(f"Assign job to {tech['name']}", ["Select job"] + list(job_options.keys()), key=f"assign_{tech['id']}")
-                        if selected_job != "Select job" and st.button("Assign", key=f"assignbtn_{tech['id']}"):
-                            assign_technician(job_options[selected_job], tech['id'])
-                            st.success(f"Assigned {tech['name']} to {selected_job}")
-                            st.rerun()
+        # Static cards laid out by a CSS grid in a single markdown element
+        cards = []
+        for tech in technicians:
+            status = tech['status']
+            status_color = TECHNICIAN_STATUS_COLORS.get(status, "gray")
+            cards.append(f"""
+            <div style='border: 1px solid #ddd; padding: 10px; border-radius: 5px; margin: 5px 0;'>
+                <h4>👨‍🔧 {tech['name']}</h4>
+                <p><strong>Status:</strong> <span style='color:{status_color}'>{status.title()}</span></p>
+                <p><strong>Specialization:</strong> {tech['specialization']}</p>
+                <p><strong>Contact:</strong> {tech['contact']}</p>
+                <p><strong>Exp:</strong> {tech.get('experience_years', 0)} years</p>
+            </div>
+            """)
+        st.markdown(
+            "<div style='display: grid; grid-template-columns: repeat(3, 1fr); gap: 8px;'>"
+            + "".join(card.strip() for card in cards) + "</div>",
+            unsafe_allow_html=True
+        )
+        
+        # Assign to breakdown if available
+        available_techs = [tech for tech in technicians if tech['status'] == 'available']
+        if available_techs:
+            active_jobs = get_breakdowns_by_garage_and_status(garage_id, ['assigned'])
+            job_options = {f"#{j['id']} - {j['make']} {j['model']}": j['id'] for j in active_jobs}
+            if job_options:
+                job_labels = ["Select job"] + list(job_options)
+                for tech in available_techs:
+                    tech_id, tech_name = tech['id'], tech['name']
+                    selected_job = st.selectbox(f"Assign job to {tech_name}", job_labels, key=f"assign_{tech_id}")
+                    if selected_job != "Select job":
+                        st.button("Assign", key=f"assignbtn_{tech_id}", on_click=_assign_technician,
+                                  args=(tech_id, tech_name, job_options))
     else:
         st.info("No technicians added yet. Add your first technician above.")
 
+# Figures are cached on the (month, value) pairs so unchanged data skips the rebuild
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_completions_bar(items):
+    months, completions = zip(*items)
+    fig = go.Figure(data=[
+        go.Bar(x=list(months), y=list(completions), marker_color='#36A2EB')
+    ])
+    fig.update_layout(
+        title="Jobs Completed Per Month",
+        xaxis_title="Month",
+        yaxis_title="Number of Jobs",
+        height=300
+    )
+    return fig
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_revenue_line(items):
+    months, revenue = zip(*items)
+    fig = go.Figure(data=[
+        go.Scattergl(x=list(months), y=list(revenue), mode='lines+markers', line=dict(color='#4BC0C0', width=3))
+    ])
+    fig.update_layout(
+        title="Monthly Revenue (₹)",
+        xaxis_title="Month",
+        yaxis_title="Revenue",
+        height=300
+    )
+    return fig
+
 def render_garage_analytics_tab(garage_id):
     st.markdown("### 📊 Garage Analytics")
     
     # Get analytics data
-    analytics = get_garage_analytics(garage_id)
+    analytics = _cached_garage_analytics(garage_id)
     
     col1, col2 = st.columns(2)
     
@@ -1491,50 +1744,29 @@ def render_garage_analytics_tab(garage_id):
         # Create a simple bar chart for monthly completions
         monthly_data = analytics.get('monthly_completions', {})
         if monthly_data:
-            months = list(monthly_data.keys())
-            completions = list(monthly_data.values())
-            
-            fig = go.Figure(data=[
-                go.Bar(x=months, y=completions, marker_color='#36A2EB')
-            ])
-            fig.update_layout(
-                title="Jobs Completed Per Month",
-                xaxis_title="Month",
-                yaxis_title="Number of Jobs",
-                height=300
-            )
+            fig = _build_completions_bar(tuple(monthly_data.items()))
             st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         st.markdown("#### Revenue Trend")
         revenue_data = analytics.get('monthly_revenue', {})
         if revenue_data:
-            months = list(revenue_data.keys())
-            revenue = list(revenue_data.values())
-            
-            fig = go.Figure(data=[
-                go.Scatter(x=months, y=revenue, mode='lines+markers', line=dict(color='#4BC0C0', width=3))
-            ])
-            fig.update_layout(
-                title="Monthly Revenue (₹)",
-                xaxis_title="Month",
-                yaxis_title="Revenue",
-                height=300
-            )
+            fig = _build_revenue_line(tuple(revenue_data.items()))
             st.plotly_chart(fig, use_container_width=True)
     
     # Customer ratings
     st.markdown("#### Customer Feedback")
-    feedback = get_garage_feedback(garage_id)
+    feedback = _cached_garage_feedback(garage_id)
     
     if feedback:
-        avg_rating = sum(f['rating'] for f in feedback) / len(feedback)
+        ratings = np.fromiter((f['rating'] for f in feedback), dtype=np.int8, count=len(feedback))
+        avg_rating = float(ratings.mean())
         
         col_a, col_b, col_c = st.columns(3)
         with col_a:
             st.metric("Average Rating", f"{avg_rating:.1f}/5")
         with col_b:
-            positive = sum(1 for f in feedback if f['rating'] >= 4)
+            positive = int((ratings >= 4).sum())
             st.metric("Positive Reviews", positive)
         with col_c:
             response_rate = analytics.get('response_rate', 0)
@@ -1542,36 +1774,30 @@ def render_garage_analytics_tab(garage_id):
         
         # Show recent feedback
         st.markdown("##### Recent Comments")
-        for fb in feedback[:3]:
-            stars = "⭐" * fb['rating'] + "☆" * (5 - fb['rating'])
-            st.markdown(f"""
+        st.markdown("\n".join(f"""
             <div style='background: #f8f9fa; padding: 10px; border-radius: 5px; margin: 5px 0;'>
-                <p><strong>{stars}</strong></p>
+                <p><strong>{"⭐" * fb['rating'] + "☆" * (5 - fb['rating'])}</strong></p>
                 <p><em>"{fb.get('comments', 'No comment')}"</em></p>
                 <p style='font-size: 0.8em; color: #666;'>{fb.get('vehicle_model', 'Unknown')} • {fb.get('created_at', '')[:10]}</p>
             </div>
-            """, unsafe_allow_html=True)
+            """ for fb in feedback[:3]), unsafe_allow_html=True)
     else:
         st.info("No customer feedback yet.")
 
 # Add to the navigation in main() function
 # In the radio selector, add "Garage Dashboard":
 
-def render_architecture():
-    st.markdown("## System Architecture")
-    
-    st.markdown("""
+# Static architecture page content, built once at import
+ARCH_OVERVIEW_MD = """
     ### AutoSenseAI - Agentic AI Platform for Predictive Maintenance
     
     AutoSenseAI is a comprehensive predictive maintenance platform designed for the automotive industry,
     specifically tailored for Hero and Mahindra vehicles. The system uses a multi-agent AI architecture
     to autonomously predict failures, diagnose issues, schedule services, and maintain a continuous
     feedback loop with OEM manufacturing teams.
-    """)
-    
-    st.markdown("### Architecture Diagram")
-    
-    st.markdown("""
+    """
+
+ARCH_DIAGRAM_MD = """
     ```
     ┌─────────────────────────────────────────────────────────────────────────────┐
     │                           AUTOSENSEAI PLATFORM                               │
@@ -1629,14 +1855,9 @@ def render_architecture():
     │                                                                              │
     └─────────────────────────────────────────────────────────────────────────────┘
     ```
-    """)
-    
-    st.markdown("### Agent Responsibilities")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
+    """
+
+ARCH_AGENTS_LEFT_MD = """
         **Master Agent (Orchestrator)**
         - Coordinates all worker agents
         - Manages workflow execution
@@ -1654,10 +1875,9 @@ def render_architecture():
         - Maps symptoms to possible issues
         - Recommends repair actions
         - Estimates repair time and parts
-        """)
-    
-    with col2:
-        st.markdown("""
+        """
+
+ARCH_AGENTS_RIGHT_MD = """
         **Scheduling Agent**
         - Selects optimal service center
         - Finds available time slots
@@ -1675,11 +1895,9 @@ def render_architecture():
         - Generates root cause reports
         - Aggregates service feedback
         - Notifies OEM for manufacturing insights
-        """)
-    
-    st.markdown("### Data Flow")
-    
-    st.markdown("""
+        """
+
+ARCH_DATA_FLOW_MD = """
     ```
     Vehicle Telemetry → Prediction Agent → Anomaly Detection → Failure Prediction
                                               ↓
@@ -1693,24 +1911,55 @@ def render_architecture():
                                               ↓
                                         RCA Agent → OEM Manufacturing Insights
     ```
-    """)
+    """
+
+def render_architecture():
+    st.markdown("## System Architecture")
+    
+    st.markdown(ARCH_OVERVIEW_MD)
+    
+    st.markdown("### Architecture Diagram")
+    
+    st.markdown(ARCH_DIAGRAM_MD)
+    
+    st.markdown("### Agent Responsibilities")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(ARCH_AGENTS_LEFT_MD)
+    
+    with col2:
+        st.markdown(ARCH_AGENTS_RIGHT_MD)
+    
+    st.markdown("### Data Flow")
+    
+    st.markdown(ARCH_DATA_FLOW_MD)
+
+# Sidebar view name -> renderer, in menu order
+VIEWS = {
+    "OEM Dashboard": render_oem_dashboard,
+    "Service Center": render_service_center_view,
+    "Vehicle Owner": render_vehicle_owner_portal,
+    "Breakdown Assistance": render_breakdown_assistance,
+    "Parts Catalog": render_parts_catalog,
+    "Telemetry Simulator": render_telemetry_simulator,
+    "Agent Logs": render_agent_logs,
+    "Architecture": render_architecture,
+    "Garage Dashboard": render_garage_dashboard,
+}
 
 def main():
     st.sidebar.markdown("# 🚗 AutoSenseAI")
     st.sidebar.markdown("*Predictive Maintenance Platform*")
     st.sidebar.markdown("---")
     
-    view = st.sidebar.radio(
-    "Select View",
-    ["OEM Dashboard", "Service Center", "Vehicle Owner", "Breakdown Assistance", 
-     "Parts Catalog", "Telemetry Simulator", "Agent Logs", "Architecture", 
-     "Garage Dashboard"],  # ← Add this
-    index=0
-)
+    view = st.sidebar.radio("Select View", list(VIEWS), index=0)
     
     st.sidebar.markdown("---")
     st.sidebar.markdown("### Quick Stats")
-    stats = get_dashboard_stats()
+    # Fetched once per run; the OEM dashboard reads the same snapshot
+    stats = st.session_state['stats'] = _cached_dashboard_stats()
     st.sidebar.metric("Fleet Health", f"{100 - (stats['critical_vehicles'] / max(stats['total_vehicles'], 1)) * 100:.0f}%")
     st.sidebar.metric("Active Alerts", stats['active_alerts'])
     
@@ -1739,24 +1988,7 @@ def main():
     *Built for EY Techathon 6.0*
     """)
     
-    if view == "OEM Dashboard":
-        render_oem_dashboard()
-    elif view == "Service Center":
-        render_service_center_view()
-    elif view == "Vehicle Owner":
-        render_vehicle_owner_portal()
-    elif view == "Breakdown Assistance":
-        render_breakdown_assistance()
-    elif view == "Parts Catalog":
-        render_parts_catalog()
-    elif view == "Telemetry Simulator":
-        render_telemetry_simulator()
-    elif view == "Agent Logs":
-        render_agent_logs()
-    elif view == "Architecture":
-        render_architecture()
-    elif view == "Garage Dashboard":
-        render_garage_dashboard()
+    VIEWS[view]()
 
 if __name__ == "__main__":
     main()
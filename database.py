@@ -1,36 +1,396 @@
 import sqlite3
 import json
+import orjson
 from datetime import datetime, timedelta
 import random
 from contextlib import contextmanager
+import atexit
+import copy
+from concurrent.futures import Future
+import functools
+import logging
+import queue
+import threading
+import time
 
+import math
 import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_PATH = os.path.join(BASE_DIR, "autosenseai.db")
 
-@contextmanager
-def get_db_connection():
+# Upper bound on memory-mapped reads; SQLite only maps as much of the file as exists
+MMAP_SIZE = 1024 * 1024 * 1024
+
+# WAL mode is persisted in the database file, so it only needs setting once per path
+_wal_enabled_paths = set()
+
+def _configure_connection(conn, path):
+    if path not in _wal_enabled_paths:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled_paths.add(path)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+
+# Idle connections per database path; checked out by get_db_connection and returned afterwards
+POOL_SIZE = 8
+# Prepared statements kept per connection; pooled connections keep them across calls
+STATEMENT_CACHE_SIZE = 256
+# Page cache (KiB) for the report connections, which scan far more pages than the short getters
+ANALYTICS_CACHE_SIZE = 131072
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _new_connection(path, readonly=False, analytics=False):
+    if readonly:
+        # WAL lets any number of these read alongside the writer; the file must already exist
+        conn = sqlite3.connect(
+            Path(path).resolve().as_uri() + "?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        # Readers build dicts straight from tuples (_fetch_dicts/_fetch_dict), so skip sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size=-{ANALYTICS_CACHE_SIZE if analytics else 65536}")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
     conn = sqlite3.connect(
-    DATABASE_PATH,
-    check_same_thread=False
+    path,
+    check_same_thread=False,
+    cached_statements=STATEMENT_CACHE_SIZE
 )
     conn.row_factory = sqlite3.Row
+    _configure_connection(conn, path)
+    return conn
+
+def _get_pool(key):
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = queue.Queue(maxsize=POOL_SIZE)
+        return _pools[key]
+
+@contextmanager
+def get_db_connection():
+    with _pooled_connection(readonly=False) as conn:
+        yield conn
+
+@contextmanager
+def get_reader_connection():
+    """Pooled read-only connection for the get_* helpers"""
+    with _pooled_connection(readonly=True) as conn:
+        yield conn
+
+@contextmanager
+def get_analytics_connection():
+    """Read-only connection for the report queries, pooled apart from get_reader_connection
+    so their scans don't evict the short getters' pages"""
+    with _pooled_connection(readonly=True, analytics=True) as conn:
+        yield conn
+
+@contextmanager
+def _pooled_connection(readonly, analytics=False):
+    path = DATABASE_PATH
+    pool = _get_pool((path, readonly, analytics))
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _new_connection(path, readonly, analytics)
     try:
         yield conn
     finally:
-        conn.close()
+        # Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+def _fetch_dicts(cursor):
+    """Fetch all rows as dicts, reading the column names once instead of per row"""
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def _iter_dicts(cursor, chunk_size):
+    """Yield rows as dicts, fetching chunk_size rows at a time"""
+    columns = [col[0] for col in cursor.description]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            yield dict(zip(columns, row))
+
+def _fetch_dict(cursor):
+    """Fetch one row as a dict, or None"""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([col[0] for col in cursor.description], row))
+
+@atexit.register
+def close_all_connections():
+    with _pools_lock:
+        for pool in _pools.values():
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+        _pools.clear()
+
+# Hot-path inserts, shared so every call hits the same cached prepared statement
+SQL_INSERT_TELEMETRY = '''
+    INSERT INTO telemetry_data (
+        vehicle_id, timestamp, engine_temp, oil_pressure, battery_voltage,
+        rpm, speed, vibration_level, brake_wear, tire_pressure_fl,
+        tire_pressure_fr, tire_pressure_rl, tire_pressure_rr, error_codes,
+        fuel_level, coolant_temp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_ALERT = '''
+    INSERT INTO alerts (vehicle_id, alert_type, severity, component, description, failure_probability, predicted_failure_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_BOOKING = '''
+    INSERT INTO bookings (vehicle_id, service_center_id, alert_id, booking_date, booking_time, service_type, priority, estimated_duration)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_FEEDBACK = '''
+    INSERT INTO feedback (booking_id, vehicle_id, rating, comments, issue_resolved, additional_issues, rca_notes, capa_actions)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_AGENT_LOG = '''
+    INSERT INTO agent_logs (agent_name, action, input_data, output_data, decision_reasoning, execution_time, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# What the garage job cards read, selected instead of b.* by the breakdown list queries
+BREAKDOWN_CARD_COLUMNS = '''
+    b.id, b.vehicle_id, b.garage_id, b.breakdown_type, b.breakdown_location_lat, b.breakdown_location_lng,
+    b.reported_at, b.estimated_fix_time, b.status, b.technician_notes,
+    v.make, v.model, v.year, v.owner_name, v.owner_phone, v.vin
+'''
+
+# Hot-path inserts and status updates are queued to a single writer thread, which owns
+# its own connection and commits whatever has queued up in one transaction
+_write_queue = queue.Queue()
+_writer_thread = None
+_writer_start_lock = threading.Lock()
+
+def _writer_loop():
+    connections = {}
+    while True:
+        batch = [_write_queue.get()]
+        while True:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        # Consecutive jobs for the same database share one transaction
+        start = 0
+        while start < len(batch):
+            path = batch[start][0]
+            end = start
+            while end < len(batch) and batch[end][0] == path:
+                end += 1
+            jobs = batch[start:end]
+            try:
+                if path not in connections:
+                    connections[path] = _new_connection(path)
+                _run_write_batch(connections[path], jobs)
+            except Exception as exc:
+                # The thread must survive: fail whatever is still pending and reopen the connection next time
+                for job in jobs:
+                    if not job[4].done():
+                        job[4].set_exception(exc)
+                conn = connections.pop(path, None)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            start = end
+        for _ in batch:
+            _write_queue.task_done()
+
+def _run_write_batch(conn, jobs):
+    done = []
+    cursor = conn.cursor()
+    # Explicit BEGIN so releasing a job's savepoint never commits on its own
+    cursor.execute("BEGIN")
+    for _, sql, params, mode, future in jobs:
+        # Each job runs under its own savepoint, so a failing job leaves none of its rows behind
+        cursor.execute("SAVEPOINT write_job")
+        try:
+            if mode == 'rowcount':
+                cursor.executemany(sql, params)
+                done.append((future, cursor.rowcount))
+            elif mode == 'returning':
+                # Drain the RETURNING rows so the statement is finished before commit
+                rows = cursor.execute(sql, params).fetchall()
+                done.append((future, dict(rows[0]) if rows else None))
+            else:
+                cursor.execute(sql, params)
+                done.append((future, cursor.lastrowid))
+        except Exception as exc:
+            cursor.execute("ROLLBACK TO write_job")
+            future.set_exception(exc)
+        cursor.execute("RELEASE write_job")
+    try:
+        conn.commit()
+    except Exception as exc:
+        conn.rollback()
+        for future, _ in done:
+            future.set_exception(exc)
+        return
+    for future, result in done:
+        future.set_result(result)
+
+def _enqueue_write(sql, params, mode):
+    global _writer_thread
+    with _writer_start_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(target=_writer_loop, name="db-writer", daemon=True)
+            _writer_thread.start()
+    future = Future()
+    _write_queue.put((DATABASE_PATH, sql, params, mode, future))
+    return future
+
+def _submit_write(sql, params, many=False, wait=True):
+    """Run a write on the writer thread and wait for its commit.
+    Returns lastrowid, or rowcount when many=True; with wait=False the Future is returned at once."""
+    future = _enqueue_write(sql, params, 'rowcount' if many else 'lastrowid')
+    return future.result() if wait else future
+
+def _submit_returning(sql, params):
+    """Run one statement with a RETURNING clause; returns its first row as a dict, or None"""
+    return _enqueue_write(sql, params, 'returning').result()
+
+def _submit_update(sql, params):
+    """Run one UPDATE/DELETE on the writer thread; returns the number of rows changed"""
+    return _submit_write(sql, [params], many=True)
+
+def _wait_for_writes():
+    """Block until every queued write has been committed"""
+    if _writer_thread is not None:
+        _write_queue.join()
+
+def _dumps(obj):
+    """Serialize to a JSON string with orjson, falling back to json for types it rejects.
+    bytes are taken to be JSON the caller already encoded and are passed through."""
+    if isinstance(obj, bytes):
+        return obj.decode()
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        return json.dumps(obj)
+
+def _ttl_cache(ttl):
+    """Memoise a read helper for ttl seconds; each caller gets its own copy of the result"""
+    def decorator(fn):
+        entries = {}
+        lock = threading.Lock()
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (DATABASE_PATH, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                hit = entries.get(key)
+            if hit is None or now - hit[0] >= ttl:
+                hit = (now, fn(*args, **kwargs))
+                with lock:
+                    entries[key] = hit
+            return copy.deepcopy(hit[1])
+        
+        def cache_clear():
+            with lock:
+                entries.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+# Housekeeping: PRAGMA optimize refreshes planner statistics only where they have drifted,
+# and old telemetry is archived at most once per TELEMETRY_ARCHIVE_INTERVAL
+OPTIMIZE_INTERVAL = 15 * 60
+_optimize_timers = {}
+_optimize_lock = threading.Lock()
+
+def _schedule_optimize(path):
+    with _optimize_lock:
+        if path in _optimize_timers:
+            return
+        timer = threading.Timer(OPTIMIZE_INTERVAL, _run_optimize, args=(path,))
+        timer.daemon = True
+        _optimize_timers[path] = timer
+        timer.start()
+
+def _run_optimize(path):
+    try:
+        conn = _new_connection(path)
+        try:
+            conn.execute("PRAGMA optimize")
+            now = time.monotonic()
+            if now - _last_archive.get(path, -TELEMETRY_ARCHIVE_INTERVAL) >= TELEMETRY_ARCHIVE_INTERVAL:
+                _last_archive[path] = now
+                _archive_telemetry(conn, TELEMETRY_RETENTION_DAYS)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    with _optimize_lock:
+        _optimize_timers.pop(path, None)
+    _schedule_optimize(path)
+
+def _sync_service_center_specializations(cursor):
+    # Expand each center's JSON specializations list into the junction table
+    cursor.execute('''
+        INSERT OR IGNORE INTO service_center_specializations (sc_id, tag)
+        SELECT sc.id, lower(j.value)
+        FROM service_centers sc, json_each(sc.specializations) j
+        WHERE json_valid(sc.specializations)
+    ''')
+
+# Bumped whenever init_database gains a migration for databases created by older versions
+SCHEMA_VERSION = 3
+
+# Garage job-board ordering, kept as a virtual column so (garage_id, status_rank, reported_at) can be indexed
+BREAKDOWN_STATUS_RANK = """
+    CASE status
+        WHEN 'in_progress' THEN 1
+        WHEN 'assigned' THEN 2
+        WHEN 'reported' THEN 3
+        WHEN 'completed' THEN 4
+        ELSE 5
+    END"""
 
 def init_database():
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        schema_version = cursor.fetchone()[0]
         
         # Create tables in proper order (vehicles first since others reference it)
         
         # VEHICLES FIRST (referenced by others)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS vehicles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 vin TEXT UNIQUE NOT NULL,
                 make TEXT NOT NULL,
                 model TEXT NOT NULL,
@@ -45,11 +405,43 @@ def init_database():
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_status ON vehicles(status, health_score)")
+        # Trigram full-text index for search_vehicles; matches substrings like LIKE '%term%' did
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'vehicles_fts'")
+        fts_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS vehicles_fts USING fts5(
+                vin, make, model, owner_name,
+                content='vehicles', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS vehicles_fts_insert AFTER INSERT ON vehicles BEGIN
+                INSERT INTO vehicles_fts (rowid, vin, make, model, owner_name)
+                VALUES (new.id, new.vin, new.make, new.model, new.owner_name);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS vehicles_fts_delete AFTER DELETE ON vehicles BEGIN
+                INSERT INTO vehicles_fts (vehicles_fts, rowid, vin, make, model, owner_name)
+                VALUES ('delete', old.id, old.vin, old.make, old.model, old.owner_name);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS vehicles_fts_update AFTER UPDATE OF vin, make, model, owner_name ON vehicles BEGIN
+                INSERT INTO vehicles_fts (vehicles_fts, rowid, vin, make, model, owner_name)
+                VALUES ('delete', old.id, old.vin, old.make, old.model, old.owner_name);
+                INSERT INTO vehicles_fts (rowid, vin, make, model, owner_name)
+                VALUES (new.id, new.vin, new.make, new.model, new.owner_name);
+            END
+        ''')
+        if not fts_exists:
+            cursor.execute("INSERT INTO vehicles_fts (vehicles_fts) VALUES ('rebuild')")
         
         # GARAGES
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS garages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 name TEXT NOT NULL,
                 latitude REAL NOT NULL,
                 longitude REAL NOT NULL,
@@ -64,11 +456,36 @@ def init_database():
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        # Spatial index over garage coordinates, kept in sync by triggers
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS garages_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng)")
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS garages_rtree_insert AFTER INSERT ON garages BEGIN
+                INSERT INTO garages_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS garages_rtree_update AFTER UPDATE OF latitude, longitude ON garages BEGIN
+                UPDATE garages_rtree SET min_lat = new.latitude, max_lat = new.latitude,
+                       min_lng = new.longitude, max_lng = new.longitude
+                WHERE id = new.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS garages_rtree_delete AFTER DELETE ON garages BEGIN
+                DELETE FROM garages_rtree WHERE id = old.id;
+            END
+        ''')
+        # Backfill garages created before the index existed
+        cursor.execute('''
+            INSERT INTO garages_rtree
+            SELECT id, latitude, latitude, longitude, longitude FROM garages
+            WHERE id NOT IN (SELECT id FROM garages_rtree)
+        ''')
         
         # PARTS CATALOG
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS parts_catalog (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 part_number TEXT UNIQUE NOT NULL,
                 part_name TEXT NOT NULL,
                 category TEXT NOT NULL,
@@ -83,11 +500,14 @@ def init_database():
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_parts_make_category ON parts_catalog(make, category)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_parts_oem_price ON parts_catalog(oem_price)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_parts_part_name ON parts_catalog(part_name)")
         
         # BREAKDOWN INCIDENTS (references vehicles and garages)
-        cursor.execute('''
+        cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS breakdown_incidents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 vehicle_id INTEGER NOT NULL,
                 garage_id INTEGER,
                 breakdown_type TEXT NOT NULL,
@@ -101,15 +521,41 @@ def init_database():
                 total_cost REAL,
                 technician_notes TEXT,
                 updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                completed_at TEXT,
+                status_rank INTEGER GENERATED ALWAYS AS ({BREAKDOWN_STATUS_RANK}) VIRTUAL,
                 FOREIGN KEY (vehicle_id) REFERENCES vehicles(id),
                 FOREIGN KEY (garage_id) REFERENCES garages(id)
             )
         ''')
+        # Databases created by older versions lack the last four columns; ALTER TABLE
+        # cannot add a CURRENT_TIMESTAMP default, so updated_at starts out NULL there
+        if schema_version < SCHEMA_VERSION:
+            cursor.execute("PRAGMA table_xinfo(breakdown_incidents)")
+            breakdown_columns = {col[1] for col in cursor.fetchall()}
+            if 'technician_notes' not in breakdown_columns:
+                cursor.execute("ALTER TABLE breakdown_incidents ADD COLUMN technician_notes TEXT")
+            if 'updated_at' not in breakdown_columns:
+                cursor.execute("ALTER TABLE breakdown_incidents ADD COLUMN updated_at TEXT")
+            if 'completed_at' not in breakdown_columns:
+                cursor.execute("ALTER TABLE breakdown_incidents ADD COLUMN completed_at TEXT")
+                # Best available completion time for jobs closed before the column existed
+                cursor.execute("UPDATE breakdown_incidents SET completed_at = updated_at WHERE status = 'completed'")
+            if 'status_rank' not in breakdown_columns:
+                cursor.execute(f"ALTER TABLE breakdown_incidents ADD COLUMN status_rank INTEGER GENERATED ALWAYS AS ({BREAKDOWN_STATUS_RANK}) VIRTUAL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_breakdowns_garage_reported ON breakdown_incidents(garage_id, reported_at DESC)")
+        # Superseded by the wider index below, which also covers the reported_at sort
+        cursor.execute("DROP INDEX IF EXISTS idx_breakdowns_garage_status")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_breakdowns_garage_status_reported ON breakdown_incidents(garage_id, status, reported_at)")
+        # Superseded by the index below, which also carries the id tie-break of the history paging order
+        cursor.execute("DROP INDEX IF EXISTS idx_breakdown_vehicle_ts")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_breakdown_vehicle_ts_id ON breakdown_incidents(vehicle_id, reported_at DESC, id DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_breakdowns_garage_rank_reported ON breakdown_incidents(garage_id, status_rank, reported_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_breakdowns_vehicle_garage ON breakdown_incidents(vehicle_id, garage_id)")
         
         # TELEMETRY DATA (references vehicles)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS telemetry_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 vehicle_id INTEGER NOT NULL,
                 timestamp TEXT NOT NULL,
                 engine_temp REAL,
@@ -129,11 +575,18 @@ def init_database():
                 FOREIGN KEY (vehicle_id) REFERENCES vehicles(id)
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_vehicle_ts ON telemetry_data(vehicle_id, timestamp DESC)")
+        # Expression index so get_vehicle_health_trend can group by day straight off the index
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_vehicle_day ON telemetry_data(vehicle_id, date(timestamp))")
+        # Lets archive_old_telemetry find the rows past retention without a full scan
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_ts ON telemetry_data(timestamp)")
+        # Cold storage for rows rolled out of telemetry_data by archive_old_telemetry
+        cursor.execute("CREATE TABLE IF NOT EXISTS telemetry_archive AS SELECT * FROM telemetry_data WHERE 0")
         
         # ALERTS (references vehicles)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 vehicle_id INTEGER NOT NULL,
                 alert_type TEXT NOT NULL,
                 severity TEXT NOT NULL,
@@ -147,11 +600,15 @@ def init_database():
                 FOREIGN KEY (vehicle_id) REFERENCES vehicles(id)
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_status_created ON alerts(status, created_at DESC)")
+        # Superseded by idx_alerts_vehicle_severity, which also serves get_alerts_by_vehicle's ORDER BY
+        cursor.execute("DROP INDEX IF EXISTS idx_alerts_vehicle")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_vehicle_severity ON alerts(vehicle_id, severity DESC, created_at DESC)")
         
         # SERVICE CENTERS
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS service_centers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 name TEXT NOT NULL,
                 location TEXT NOT NULL,
                 capacity INTEGER DEFAULT 10,
@@ -162,11 +619,22 @@ def init_database():
                 operating_hours TEXT DEFAULT '9:00-18:00'
             )
         ''')
+        # One row per (service center, specialization) so routing can look tags up by index
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS service_center_specializations (
+                sc_id INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (sc_id, tag),
+                FOREIGN KEY (sc_id) REFERENCES service_centers(id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sc_spec_tag ON service_center_specializations(tag)")
+        _sync_service_center_specializations(cursor)
         
         # BOOKINGS (references vehicles, service_centers, alerts)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 vehicle_id INTEGER NOT NULL,
                 service_center_id INTEGER NOT NULL,
                 alert_id INTEGER,
@@ -185,11 +653,17 @@ def init_database():
                 FOREIGN KEY (alert_id) REFERENCES alerts(id)
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_status_date ON bookings(status, booking_date, booking_time)")
+        # The per-vehicle and per-center listings sort by date, so index the sort keys too
+        cursor.execute("DROP INDEX IF EXISTS idx_bookings_vehicle")
+        cursor.execute("DROP INDEX IF EXISTS idx_bookings_sc")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_vehicle_date ON bookings(vehicle_id, booking_date DESC, booking_time DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_sc_date ON bookings(service_center_id, booking_date, booking_time)")
         
         # FEEDBACK (references bookings, vehicles)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 booking_id INTEGER NOT NULL,
                 vehicle_id INTEGER NOT NULL,
                 rating INTEGER,
@@ -204,11 +678,14 @@ def init_database():
                 FOREIGN KEY (vehicle_id) REFERENCES vehicles(id)
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback(created_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_booking ON feedback(booking_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_vehicle ON feedback(vehicle_id)")
         
         # AGENT LOGS
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS agent_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 agent_name TEXT NOT NULL,
                 action TEXT NOT NULL,
                 input_data TEXT,
@@ -219,11 +696,12 @@ def init_database():
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_logs_created ON agent_logs(created_at DESC)")
         
         # RCA REPORTS
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS rca_reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 component TEXT NOT NULL,
                 failure_pattern TEXT,
                 root_cause TEXT,
@@ -239,7 +717,7 @@ def init_database():
         # TECHNICIANS (references garages)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS technicians (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 garage_id INTEGER NOT NULL,
                 name TEXT NOT NULL,
                 specialization TEXT,
@@ -256,7 +734,7 @@ def init_database():
         # PARTS USAGE (references breakdown_incidents)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS parts_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 incident_id INTEGER NOT NULL,
                 part_number TEXT NOT NULL,
                 part_name TEXT NOT NULL,
@@ -267,12 +745,21 @@ def init_database():
                 FOREIGN KEY (incident_id) REFERENCES breakdown_incidents(id)
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_parts_usage_incident ON parts_usage(incident_id)")
         
+        # Sampled ANALYZE so the planner sees the new indexes without scanning large tables on every start
+        cursor.execute("PRAGMA analysis_limit=400")
+        cursor.execute("ANALYZE")
+        if schema_version < SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
+    _schedule_optimize(DATABASE_PATH)
 
 def seed_sample_data():
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        # One write transaction covers the emptiness check and all inserts
+        cursor.execute("BEGIN IMMEDIATE")
         
         cursor.execute("SELECT COUNT(*) FROM vehicles")
         if cursor.fetchone()[0] > 0:
@@ -308,16 +795,24 @@ def seed_sample_data():
             INSERT INTO service_centers (name, location, capacity, current_load, specializations, rating, contact_phone, operating_hours)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', service_centers)
+        _sync_service_center_specializations(cursor)
         
+        # Refresh planner statistics now the tables have rows
+        cursor.execute("ANALYZE")
         conn.commit()
+        get_dashboard_stats.cache_clear()
+        get_all_service_centers.cache_clear()
 # Add this function to database.py
 def seed_additional_data():
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        seeded = False
         
         # Check if garages already exist
         cursor.execute("SELECT COUNT(*) FROM garages")
         if cursor.fetchone()[0] == 0:
+            seeded = True
             garages = [
                 ("QuickFix Auto Services", 19.0760, 72.8777, "Mumbai Central", "022-11111111", 4.2, "Emergency, General", 15, 10, 3),
                 ("Hero Roadside Assistance", 19.2183, 72.9781, "Thane", "022-22222222", 4.5, "Hero, Two-Wheelers", 20, 8, 2),
@@ -336,6 +831,7 @@ def seed_additional_data():
         # Check if parts already exist
         cursor.execute("SELECT COUNT(*) FROM parts_catalog")
         if cursor.fetchone()[0] == 0:
+            seeded = True
             parts = [
                 ("ENG001", "Engine Assembly", "Engine", "Hero", "Splendor", 2020, 2024, 15000.00, 12000.00, 5, 7),
                 ("BAT001", "Battery 12V", "Electrical", "Hero", "All Models", 2018, 2024, 3000.00, 2500.00, 20, 2),
@@ -356,103 +852,177 @@ def seed_additional_data():
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', parts)
         
+        # Statistics only need refreshing when something was inserted
+        if seeded:
+            cursor.execute("ANALYZE")
         conn.commit()
+        if seeded:
+            get_nearby_garages.cache_clear()
+            _clear_parts_cache()
 def get_all_vehicles():
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM vehicles ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 # Add these functions to database.py
 
+KM_PER_DEGREE_LAT = 111.0
+
+def _bounding_box(latitude, longitude, radius_km):
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(latitude))
+    # Near the poles a degree of longitude shrinks to nothing; search every longitude instead
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * cos_lat) if cos_lat > 0.01 else 180.0
+    return latitude - lat_delta, latitude + lat_delta, longitude - lng_delta, longitude + lng_delta
+
+@_ttl_cache(ttl=30)
 def get_nearby_garages(latitude, longitude, radius_km=10):
-    with get_db_connection() as conn:
+    # The R-Tree narrows the search to a lat/lng box; the trig only runs on garages inside it
+    min_lat, max_lat, min_lng, max_lng = _bounding_box(latitude, longitude, radius_km)
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT *, 
+            SELECT g.*, 
             (6371 * acos(
-                cos(radians(?)) * cos(radians(latitude)) * 
-                cos(radians(longitude) - radians(?)) + 
-                sin(radians(?)) * sin(radians(latitude))
+                cos(radians(?)) * cos(radians(g.latitude)) * 
+                cos(radians(g.longitude) - radians(?)) + 
+                sin(radians(?)) * sin(radians(g.latitude))
             )) as distance_km
-            FROM garages
-            WHERE distance_km < ?
-            ORDER BY distance_km, rating DESC
-        ''', (latitude, longitude, latitude, radius_km))
-        return [dict(row) for row in cursor.fetchall()]
+            FROM garages_rtree r
+            JOIN garages g ON g.id = r.id
+            WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lng >= ? AND r.max_lng <= ?
+              AND distance_km < ?
+            ORDER BY distance_km, g.rating DESC
+        ''', (latitude, longitude, latitude, min_lat, max_lat, min_lng, max_lng, radius_km))
+        return _fetch_dicts(cursor)
 
-def get_parts_catalog(make=None, model=None, category=None):
-    with get_db_connection() as conn:
+PARTS_SORT_COLUMNS = ('part_name', 'oem_price', 'stock_quantity', 'lead_time_days')
+
+def _parts_catalog_query(make=None, model=None, category=None, order_by='part_name', descending=False, search=None):
+    if order_by not in PARTS_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort parts by {order_by!r}")
+    
+    # Savings are derived here so callers don't recompute them over the whole frame
+    query = """
+        SELECT *,
+               ROUND(oem_price - aftermarket_price, 2) AS savings_amount,
+               ROUND((oem_price - aftermarket_price) * 100.0 / NULLIF(oem_price, 0), 1) AS savings_percent
+        FROM parts_catalog WHERE 1=1
+    """
+    params = []
+    
+    if make:
+        query += " AND (make = ? OR make = 'Both')"
+        params.append(make)
+    if model:
+        query += " AND (model = ? OR model = 'All Models')"
+        params.append(model)
+    if category:
+        query += " AND category = ?"
+        params.append(category)
+    if search:
+        pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query += " AND (part_name LIKE ? ESCAPE '\\' OR part_number LIKE ? ESCAPE '\\')"
+        params.extend([pattern, pattern])
+    
+    query += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+    return query, params
+
+@_ttl_cache(ttl=30)
+def get_parts_catalog(make=None, model=None, category=None, order_by='part_name', descending=False, search=None):
+    query, params = _parts_catalog_query(make, model, category, order_by, descending, search)
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        query = "SELECT * FROM parts_catalog WHERE 1=1"
-        params = []
-        
-        if make:
-            query += " AND (make = ? OR make = 'Both')"
-            params.append(make)
-        if model:
-            query += " AND (model = ? OR model = 'All Models')"
-            params.append(model)
-        if category:
-            query += " AND category = ?"
-            params.append(category)
-        
-        query += " ORDER BY part_name"
         cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
-def create_breakdown_incident(vehicle_id, breakdown_type, latitude, longitude, garage_id=None):
-    with get_db_connection() as conn:
+@_ttl_cache(ttl=30)
+def get_parts_catalog_columns(make=None, model=None, category=None, order_by='part_name', descending=False, search=None):
+    """Same rows as get_parts_catalog, returned column-wise as {column: [values]}"""
+    query, params = _parts_catalog_query(make, model, category, order_by, descending, search)
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO breakdown_incidents (vehicle_id, breakdown_type, 
-                                           breakdown_location_lat, breakdown_location_lng,
-                                           garage_id, reported_at, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (vehicle_id, breakdown_type, latitude, longitude, garage_id, 
-              datetime.now().isoformat(), 'reported'))
-        conn.commit()
-        return cursor.lastrowid
+        cursor.execute(query, params)
+        columns = [col[0] for col in cursor.description]
+        rows = cursor.fetchall()
+        if not rows:
+            return {col: [] for col in columns}
+        return {col: list(values) for col, values in zip(columns, zip(*rows))}
+
+def _clear_parts_cache():
+    get_parts_catalog.cache_clear()
+    get_parts_catalog_columns.cache_clear()
+    _fetch_by_id.cache_clear()
+
+def create_breakdown_incident(vehicle_id, breakdown_type, latitude, longitude, garage_id=None):
+    # reported_at is stamped by SQLite in the same local ISO format the app has always stored
+    return _submit_write('''
+        INSERT INTO breakdown_incidents (vehicle_id, breakdown_type, 
+                                       breakdown_location_lat, breakdown_location_lng,
+                                       garage_id, reported_at, status)
+        VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), ?)
+    ''', (vehicle_id, breakdown_type, latitude, longitude, garage_id, 'reported'))
 
 def update_breakdown_estimate(incident_id, estimated_fix_time, garage_id):
-    with get_db_connection() as conn:
+    _submit_write('''
+        UPDATE breakdown_incidents 
+        SET estimated_fix_time = ?, garage_id = ?, status = 'assigned'
+        WHERE id = ?
+    ''', (estimated_fix_time, garage_id, incident_id))
+
+# What the breakdown history cards show, plus the keys and vehicle identity; the wide
+# columns (parts_used JSON, notes, costs) stay out of the history listing
+BREAKDOWN_HISTORY_COLUMNS = '''
+    b.id, b.vehicle_id, b.garage_id, b.breakdown_type, b.reported_at, b.status, b.estimated_fix_time,
+    v.make, v.model, v.vin, g.name as garage_name
+'''
+
+def _breakdown_history_query(vehicle_id=None, before=None, limit=None):
+    # Keyset paging: pass the last row's (reported_at, id) as before to fetch the next page;
+    # id breaks ties, so rows sharing a reported_at at a page boundary are not skipped
+    query = f"""
+        SELECT {BREAKDOWN_HISTORY_COLUMNS}
+        FROM breakdown_incidents b
+        JOIN vehicles v ON b.vehicle_id = v.id
+        LEFT JOIN garages g ON b.garage_id = g.id
+        WHERE 1=1
+    """
+    params = []
+    
+    if vehicle_id:
+        query += " AND b.vehicle_id = ?"
+        params.append(vehicle_id)
+    if before is not None:
+        query += " AND (b.reported_at, b.id) < (?, ?)"
+        params.extend(before)
+    
+    query += " ORDER BY b.reported_at DESC, b.id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+def get_breakdown_history(vehicle_id=None, before=None, limit=None):
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE breakdown_incidents 
-            SET estimated_fix_time = ?, garage_id = ?, status = 'assigned'
-            WHERE id = ?
-        ''', (estimated_fix_time, garage_id, incident_id))
-        conn.commit()
+        cursor.execute(*_breakdown_history_query(vehicle_id, before, limit))
+        return _fetch_dicts(cursor)
 
-def get_breakdown_history(vehicle_id=None):
-    with get_db_connection() as conn:
+def iter_breakdown_history(vehicle_id=None, before=None, limit=None, chunk_size=1024):
+    """Like get_breakdown_history but yields rows in chunks instead of building a list"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        if vehicle_id:
-            cursor.execute('''
-                SELECT b.*, v.make, v.model, v.vin, g.name as garage_name
-                FROM breakdown_incidents b
-                JOIN vehicles v ON b.vehicle_id = v.id
-                LEFT JOIN garages g ON b.garage_id = g.id
-                WHERE b.vehicle_id = ?
-                ORDER BY b.reported_at DESC
-            ''', (vehicle_id,))
-        else:
-            cursor.execute('''
-                SELECT b.*, v.make, v.model, v.vin, g.name as garage_name
-                FROM breakdown_incidents b
-                JOIN vehicles v ON b.vehicle_id = v.id
-                LEFT JOIN garages g ON b.garage_id = g.id
-                ORDER BY b.reported_at DESC
-            ''')
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute(*_breakdown_history_query(vehicle_id, before, limit))
+        yield from _iter_dicts(cursor, chunk_size)
+
 def get_vehicle_by_id(vehicle_id):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM vehicles WHERE id = ?", (vehicle_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        return _fetch_dict(cursor)
 
 def get_all_alerts(status=None):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         if status:
             cursor.execute('''
@@ -469,85 +1039,117 @@ def get_all_alerts(status=None):
                 JOIN vehicles v ON a.vehicle_id = v.id 
                 ORDER BY a.created_at DESC
             ''')
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
-def create_alert(vehicle_id, alert_type, severity, component, description, failure_probability, predicted_failure_date=None):
-    with get_db_connection() as conn:
+def get_alert_overview(status='active'):
+    """Only the alert columns the OEM dashboard shows, newest first"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO alerts (vehicle_id, alert_type, severity, component, description, failure_probability, predicted_failure_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (vehicle_id, alert_type, severity, component, description, failure_probability, predicted_failure_date))
-        conn.commit()
-        return cursor.lastrowid
+            SELECT v.vin, v.make, v.model, a.component, a.severity, a.description,
+                   a.failure_probability, a.created_at
+            FROM alerts a
+            JOIN vehicles v ON a.vehicle_id = v.id
+            WHERE a.status = ?
+            ORDER BY a.created_at DESC
+        ''', (status,))
+        return _fetch_dicts(cursor)
+
+def create_alert(vehicle_id, alert_type, severity, component, description, failure_probability, predicted_failure_date=None):
+    alert_id = _submit_write(SQL_INSERT_ALERT, (vehicle_id, alert_type, severity, component, description, failure_probability, predicted_failure_date))
+    get_dashboard_stats.cache_clear()
+    return alert_id
+
+def create_alerts_bulk(rows):
+    """Insert many alerts in one transaction; rows are tuples in create_alert argument order.
+    Returns the number of rows inserted (lastrowid is not meaningful here)."""
+    inserted = _submit_write(SQL_INSERT_ALERT, rows, many=True)
+    get_dashboard_stats.cache_clear()
+    return inserted
 
+@_ttl_cache(ttl=60)
 def get_all_service_centers():
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM service_centers ORDER BY rating DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
+
+def get_service_centers_by_specialization(tag):
+    with get_reader_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT sc.* FROM service_center_specializations s
+            JOIN service_centers sc ON sc.id = s.sc_id
+            WHERE s.tag = ?
+            ORDER BY sc.rating DESC
+        ''', (tag.lower(),))
+        return _fetch_dicts(cursor)
+
+def _bookings_query(status=None):
+    query = """
+        SELECT b.*, v.vin, v.make, v.model, v.owner_name, v.owner_phone,
+               sc.name as service_center_name, sc.location as service_center_location
+        FROM bookings b
+        JOIN vehicles v ON b.vehicle_id = v.id
+        JOIN service_centers sc ON b.service_center_id = sc.id
+    """
+    if status:
+        return query + " WHERE b.status = ? ORDER BY b.booking_date, b.booking_time", (status,)
+    return query + " ORDER BY b.booking_date DESC, b.booking_time", ()
 
 def get_all_bookings(status=None):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        if status:
-            cursor.execute('''
-                SELECT b.*, v.vin, v.make, v.model, v.owner_name, v.owner_phone,
-                       sc.name as service_center_name, sc.location as service_center_location
-                FROM bookings b
-                JOIN vehicles v ON b.vehicle_id = v.id
-                JOIN service_centers sc ON b.service_center_id = sc.id
-                WHERE b.status = ?
-                ORDER BY b.booking_date, b.booking_time
-            ''', (status,))
-        else:
-            cursor.execute('''
-                SELECT b.*, v.vin, v.make, v.model, v.owner_name, v.owner_phone,
-                       sc.name as service_center_name, sc.location as service_center_location
-                FROM bookings b
-                JOIN vehicles v ON b.vehicle_id = v.id
-                JOIN service_centers sc ON b.service_center_id = sc.id
-                ORDER BY b.booking_date DESC, b.booking_time
-            ''')
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute(*_bookings_query(status))
+        return _fetch_dicts(cursor)
 
-def create_booking(vehicle_id, service_center_id, alert_id, booking_date, booking_time, service_type, priority, estimated_duration):
-    with get_db_connection() as conn:
+def iter_all_bookings(status=None, chunk_size=1024):
+    """Like get_all_bookings but yields rows in chunks instead of building a list"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO bookings (vehicle_id, service_center_id, alert_id, booking_date, booking_time, service_type, priority, estimated_duration)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (vehicle_id, service_center_id, alert_id, booking_date, booking_time, service_type, priority, estimated_duration))
-        conn.commit()
-        return cursor.lastrowid
+        cursor.execute(*_bookings_query(status))
+        yield from _iter_dicts(cursor, chunk_size)
+
+def create_booking(vehicle_id, service_center_id, alert_id, booking_date, booking_time, service_type, priority, estimated_duration):
+    booking_id = _submit_write(SQL_INSERT_BOOKING, (vehicle_id, service_center_id, alert_id, booking_date, booking_time, service_type, priority, estimated_duration))
+    get_dashboard_stats.cache_clear()
+    return booking_id
+
+def create_bookings_bulk(rows):
+    """Insert many bookings in one transaction; rows are tuples in create_booking argument order.
+    Returns the number of rows inserted (lastrowid is not meaningful here)."""
+    inserted = _submit_write(SQL_INSERT_BOOKING, rows, many=True)
+    get_dashboard_stats.cache_clear()
+    return inserted
 
 def update_booking_status(booking_id, status, notes=None):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        if status == 'completed':
-            cursor.execute('''
-                UPDATE bookings SET status = ?, technician_notes = ?, completed_at = ?
-                WHERE id = ?
-            ''', (status, notes, datetime.now().isoformat(), booking_id))
-        else:
-            cursor.execute('''
-                UPDATE bookings SET status = ?, technician_notes = ?
-                WHERE id = ?
-            ''', (status, notes, booking_id))
-        conn.commit()
+    if status == 'completed':
+        _submit_write('''
+            UPDATE bookings SET status = ?, technician_notes = ?,
+                   completed_at = strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')
+            WHERE id = ?
+        ''', (status, notes, booking_id))
+    else:
+        _submit_write('''
+            UPDATE bookings SET status = ?, technician_notes = ?
+            WHERE id = ?
+        ''', (status, notes, booking_id))
+    get_dashboard_stats.cache_clear()
 
 def create_feedback(booking_id, vehicle_id, rating, comments, issue_resolved, additional_issues, rca_notes, capa_actions):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO feedback (booking_id, vehicle_id, rating, comments, issue_resolved, additional_issues, rca_notes, capa_actions)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (booking_id, vehicle_id, rating, comments, issue_resolved, additional_issues, rca_notes, capa_actions))
-        conn.commit()
-        return cursor.lastrowid
+    feedback_id = _submit_write(SQL_INSERT_FEEDBACK, (booking_id, vehicle_id, rating, comments, issue_resolved, additional_issues, rca_notes, capa_actions))
+    get_dashboard_stats.cache_clear()
+    return feedback_id
+
+def create_feedback_bulk(rows):
+    """Insert many feedback rows in one transaction; rows are tuples in create_feedback argument order.
+    Returns the number of rows inserted (lastrowid is not meaningful here)."""
+    inserted = _submit_write(SQL_INSERT_FEEDBACK, rows, many=True)
+    get_dashboard_stats.cache_clear()
+    return inserted
 
 def get_all_feedback():
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT f.*, v.vin, v.make, v.model, b.service_type, sc.name as service_center_name
@@ -557,140 +1159,236 @@ def get_all_feedback():
             JOIN service_centers sc ON b.service_center_id = sc.id
             ORDER BY f.created_at DESC
         ''')
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
+
+def _report_agent_log_failure(future):
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Failed to write agent log: %s", exc)
 
 def log_agent_action(agent_name, action, input_data, output_data, decision_reasoning, execution_time, status='success'):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO agent_logs (agent_name, action, input_data, output_data, decision_reasoning, execution_time, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (agent_name, action, json.dumps(input_data) if input_data else None, 
-              json.dumps(output_data) if output_data else None, decision_reasoning, execution_time, status))
-        conn.commit()
-        return cursor.lastrowid
+    """Queues the log row without waiting for its commit; returns a Future for the new row id.
+    get_agent_logs waits for pending writes, and a failed insert is logged."""
+    future = _submit_write(SQL_INSERT_AGENT_LOG, (agent_name, action, _dumps(input_data) if input_data else None, 
+          _dumps(output_data) if output_data else None, decision_reasoning, execution_time, status), wait=False)
+    future.add_done_callback(_report_agent_log_failure)
+    return future
 
 def get_agent_logs(limit=50):
-    with get_db_connection() as conn:
+    _wait_for_writes()
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT * FROM agent_logs ORDER BY created_at DESC LIMIT ?
         ''', (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
+
+# Telemetry rows are buffered and written in batches; readers flush first. A failed flush
+# keeps its rows and retries from the timer, so readers never fail because of it
+TELEMETRY_FLUSH_SIZE = 500
+TELEMETRY_FLUSH_INTERVAL = 1.0
+_telemetry_buffer = []
+_telemetry_lock = threading.Lock()
+_telemetry_timer = None
+
+# telemetry_data only keeps recent rows; older ones move to telemetry_archive
+TELEMETRY_RETENTION_DAYS = 30
+TELEMETRY_ARCHIVE_INTERVAL = 24 * 60 * 60
+_last_archive = {}
+
+def _telemetry_row(vehicle_id, telemetry):
+    return (
+        vehicle_id, telemetry['timestamp'], telemetry['engine_temp'],
+        telemetry['oil_pressure'], telemetry['battery_voltage'], telemetry['rpm'],
+        telemetry['speed'], telemetry['vibration_level'], telemetry['brake_wear'],
+        telemetry['tire_pressure_fl'], telemetry['tire_pressure_fr'],
+        telemetry['tire_pressure_rl'], telemetry['tire_pressure_rr'],
+        list(telemetry.get('error_codes', [])), telemetry['fuel_level'],
+        telemetry['coolant_temp']
+    )
+
+def _arm_telemetry_timer():
+    # Caller holds _telemetry_lock
+    global _telemetry_timer
+    if _telemetry_timer is None:
+        _telemetry_timer = threading.Timer(TELEMETRY_FLUSH_INTERVAL, _try_flush_telemetry)
+        _telemetry_timer.daemon = True
+        _telemetry_timer.start()
 
 def save_telemetry(vehicle_id, telemetry):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    row = _telemetry_row(vehicle_id, telemetry)
+    with _telemetry_lock:
+        _telemetry_buffer.append(row)
+        flush_now = len(_telemetry_buffer) >= TELEMETRY_FLUSH_SIZE
+        if not flush_now:
+            _arm_telemetry_timer()
+    if flush_now:
+        _try_flush_telemetry()
+
+EMPTY_JSON_LIST = '[]'
+
+def _serialize_error_codes(rows):
+    # error_codes (column 13) is serialized at write time, off the producer's path;
+    # most readings have none, so skip the encoder for those
+    return [row[:13] + (_dumps(row[13]) if row[13] else EMPTY_JSON_LIST,) + row[14:] for row in rows]
+
+def save_telemetry_batch(readings):
+    """Write (vehicle_id, telemetry) pairs in one transaction, bypassing the buffer.
+    Returns the number of rows inserted."""
+    rows = [_telemetry_row(vehicle_id, telemetry) for vehicle_id, telemetry in readings]
+    if not rows:
+        return 0
+    # Keep insert order: anything already buffered goes first
+    flush_telemetry()
+    return _submit_write(SQL_INSERT_TELEMETRY, _serialize_error_codes(rows), many=True)
+
+@atexit.register
+def flush_telemetry():
+    global _telemetry_buffer, _telemetry_timer
+    with _telemetry_lock:
+        rows, _telemetry_buffer = _telemetry_buffer, []
+        if _telemetry_timer is not None:
+            _telemetry_timer.cancel()
+            _telemetry_timer = None
+    if not rows:
+        return
+    try:
+        _submit_write(SQL_INSERT_TELEMETRY, _serialize_error_codes(rows), many=True)
+    except Exception:
+        # Put the rows back ahead of anything buffered since, so the retry writes them in order
+        with _telemetry_lock:
+            _telemetry_buffer[:0] = rows
+            _arm_telemetry_timer()
+        raise
+
+def _try_flush_telemetry():
+    """flush_telemetry for the timer and read paths; returns False if the rows stay buffered"""
+    try:
+        flush_telemetry()
+    except Exception:
+        return False
+    return True
+
+def _archive_telemetry(conn, days):
+    cutoff = f'-{days} days'
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
         cursor.execute('''
-            INSERT INTO telemetry_data (
-                vehicle_id, timestamp, engine_temp, oil_pressure, battery_voltage,
-                rpm, speed, vibration_level, brake_wear, tire_pressure_fl,
-                tire_pressure_fr, tire_pressure_rl, tire_pressure_rr, error_codes,
-                fuel_level, coolant_temp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            vehicle_id, telemetry['timestamp'], telemetry['engine_temp'],
-            telemetry['oil_pressure'], telemetry['battery_voltage'], telemetry['rpm'],
-            telemetry['speed'], telemetry['vibration_level'], telemetry['brake_wear'],
-            telemetry['tire_pressure_fl'], telemetry['tire_pressure_fr'],
-            telemetry['tire_pressure_rl'], telemetry['tire_pressure_rr'],
-            json.dumps(telemetry.get('error_codes', [])), telemetry['fuel_level'],
-            telemetry['coolant_temp']
-        ))
+            INSERT INTO telemetry_archive
+            SELECT * FROM telemetry_data WHERE timestamp < date('now', ?)
+        ''', (cutoff,))
+        cursor.execute("DELETE FROM telemetry_data WHERE timestamp < date('now', ?)", (cutoff,))
+        moved = cursor.rowcount
         conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return moved
 
-def get_telemetry_history(vehicle_id, limit=100):
+def archive_old_telemetry(days=TELEMETRY_RETENTION_DAYS):
+    """Move telemetry older than the given number of days into telemetry_archive.
+    Runs at most once a day from the housekeeping timer; returns the number of rows moved."""
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
+        return _archive_telemetry(conn, days)
+
+def _telemetry_history_query(vehicle_id, limit, since):
+    # Both forms are a range scan on idx_telemetry_vehicle_ts, newest first
+    if since is None:
+        return '''
             SELECT * FROM telemetry_data WHERE vehicle_id = ?
             ORDER BY timestamp DESC LIMIT ?
-        ''', (vehicle_id, limit))
-        return [dict(row) for row in cursor.fetchall()]
+        ''', (vehicle_id, limit)
+    return '''
+        SELECT * FROM telemetry_data WHERE vehicle_id = ? AND timestamp > ?
+        ORDER BY timestamp DESC LIMIT ?
+    ''', (vehicle_id, since, limit)
 
-def update_vehicle_health(vehicle_id, health_score, status):
-    with get_db_connection() as conn:
+def get_telemetry_history(vehicle_id, limit=100, since=None):
+    """Latest telemetry rows for a vehicle, optionally only those newer than the since timestamp"""
+    _try_flush_telemetry()
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE vehicles SET health_score = ?, status = ?
-            WHERE id = ?
-        ''', (health_score, status, vehicle_id))
-        conn.commit()
+        cursor.execute(*_telemetry_history_query(vehicle_id, limit, since))
+        return _fetch_dicts(cursor)
 
-def create_rca_report(component, failure_pattern, root_cause, affected_vehicles, severity, recommendation, oem_action_required):
-    with get_db_connection() as conn:
+def iter_telemetry_history(vehicle_id, limit=100, since=None, chunk_size=256):
+    """Like get_telemetry_history but yields rows in chunks instead of building a list"""
+    _try_flush_telemetry()
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO rca_reports (component, failure_pattern, root_cause, affected_vehicles, severity, recommendation, oem_action_required)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (component, failure_pattern, root_cause, affected_vehicles, severity, recommendation, oem_action_required))
-        conn.commit()
-        return cursor.lastrowid
+        cursor.execute(*_telemetry_history_query(vehicle_id, limit, since))
+        yield from _iter_dicts(cursor, chunk_size)
+
+def update_vehicle_health(vehicle_id, health_score, status):
+    _submit_write('''
+        UPDATE vehicles SET health_score = ?, status = ?
+        WHERE id = ?
+    ''', (health_score, status, vehicle_id))
+    get_dashboard_stats.cache_clear()
 
+def create_rca_report(component, failure_pattern, root_cause, affected_vehicles, severity, recommendation, oem_action_required):
+    report_id = _submit_write('''
+        INSERT INTO rca_reports (component, failure_pattern, root_cause, affected_vehicles, severity, recommendation, oem_action_required)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (component, failure_pattern, root_cause, affected_vehicles, severity, recommendation, oem_action_required))
+    get_rca_reports.cache_clear()
+    return report_id
+
+@_ttl_cache(ttl=30)
 def get_rca_reports():
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM rca_reports ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
+@_ttl_cache(ttl=5)
 def get_dashboard_stats():
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM vehicles")
-        total_vehicles = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM alerts WHERE status = 'active'")
-        active_alerts = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'scheduled'")
-        pending_bookings = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'completed'")
-        completed_services = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(rating) FROM feedback")
-        avg_rating = cursor.fetchone()[0] or 0
-        
-        cursor.execute("SELECT COUNT(*) FROM vehicles WHERE status = 'critical'")
-        critical_vehicles = cursor.fetchone()[0]
+        # All six figures in one round-trip
+        cursor.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM vehicles),
+                (SELECT COUNT(*) FROM alerts WHERE status = 'active'),
+                (SELECT COUNT(*) FROM bookings WHERE status = 'scheduled'),
+                (SELECT COUNT(*) FROM bookings WHERE status = 'completed'),
+                (SELECT AVG(rating) FROM feedback),
+                (SELECT COUNT(*) FROM vehicles WHERE status = 'critical')
+        ''')
+        (total_vehicles, active_alerts, pending_bookings,
+         completed_services, avg_rating, critical_vehicles) = cursor.fetchone()
         
         return {
             'total_vehicles': total_vehicles,
             'active_alerts': active_alerts,
             'pending_bookings': pending_bookings,
             'completed_services': completed_services,
-            'avg_rating': round(avg_rating, 1),
+            'avg_rating': round(avg_rating or 0, 1),
             'critical_vehicles': critical_vehicles
         }
 
 def get_vehicles_by_status(status):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM vehicles WHERE status = ? ORDER BY health_score", (status,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
 def get_vehicles_by_make(make):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM vehicles WHERE make = ? ORDER BY year DESC", (make,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
     
 def update_alert_status(alert_id, status, resolved_at=None):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        if resolved_at:
-            cursor.execute('''
-                UPDATE alerts SET status = ?, resolved_at = ? WHERE id = ?
-            ''', (status, resolved_at, alert_id))
-        else:
-            cursor.execute('''
-                UPDATE alerts SET status = ? WHERE id = ?
-            ''', (status, alert_id))
-        conn.commit()
+    if resolved_at:
+        _submit_write("UPDATE alerts SET status = ?, resolved_at = ? WHERE id = ?", (status, resolved_at, alert_id))
+    else:
+        _submit_write("UPDATE alerts SET status = ? WHERE id = ?", (status, alert_id))
+    get_dashboard_stats.cache_clear()
 
 def get_alerts_by_vehicle(vehicle_id):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT a.*, v.vin, v.make, v.model 
@@ -699,9 +1397,9 @@ def get_alerts_by_vehicle(vehicle_id):
             WHERE a.vehicle_id = ?
             ORDER BY a.severity DESC, a.created_at DESC
         ''', (vehicle_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 def get_bookings_by_vehicle(vehicle_id):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT b.*, v.vin, v.make, v.model, 
@@ -712,72 +1410,90 @@ def get_bookings_by_vehicle(vehicle_id):
             WHERE b.vehicle_id = ?
             ORDER BY b.booking_date DESC, b.booking_time DESC
         ''', (vehicle_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
+
+SQL_SERVICE_CENTER_BOOKINGS = '''
+    SELECT b.*, v.vin, v.make, v.model, v.owner_name, v.owner_phone
+    FROM bookings b
+    JOIN vehicles v ON b.vehicle_id = v.id
+    WHERE b.service_center_id = ?
+    ORDER BY b.booking_date, b.booking_time
+'''
 
 def get_bookings_by_service_center(service_center_id):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT b.*, v.vin, v.make, v.model, v.owner_name, v.owner_phone
-            FROM bookings b
-            JOIN vehicles v ON b.vehicle_id = v.id
-            WHERE b.service_center_id = ?
-            ORDER BY b.booking_date, b.booking_time
-        ''', (service_center_id,))
-        return [dict(row) for row in cursor.fetchall()]
-def get_garage_by_id(garage_id):
-    with get_db_connection() as conn:
+        cursor.execute(SQL_SERVICE_CENTER_BOOKINGS, (service_center_id,))
+        return _fetch_dicts(cursor)
+
+def iter_bookings_by_service_center(service_center_id, chunk_size=1024):
+    """Like get_bookings_by_service_center but yields rows in chunks instead of building a list"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM garages WHERE id = ?", (garage_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        cursor.execute(SQL_SERVICE_CENTER_BOOKINGS, (service_center_id,))
+        yield from _iter_dicts(cursor, chunk_size)
 
-def update_garage_load(garage_id, load_change):
-    with get_db_connection() as conn:
+@_ttl_cache(30)
+def _fetch_by_id(table, row_id):
+    """Single-row lookup shared by the get_*_by_id readers; table is always a literal from this module"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE garages 
-            SET current_load = current_load + ? 
-            WHERE id = ? AND current_load + ? <= capacity
-        ''', (load_change, garage_id, load_change))
-        conn.commit()
-        return cursor.rowcount > 0
+        cursor.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,))
+        return _fetch_dict(cursor)
+
+def get_garage_by_id(garage_id):
+    return _fetch_by_id('garages', garage_id)
+
+def update_garage_load(garage_id, load_change):
+    """Returns {'current_load', 'capacity'} after the change, or None if it would exceed capacity"""
+    load = _submit_returning('''
+        UPDATE garages 
+        SET current_load = current_load + ? 
+        WHERE id = ? AND current_load + ? <= capacity
+        RETURNING current_load, capacity
+    ''', (load_change, garage_id, load_change))
+    get_nearby_garages.cache_clear()
+    _fetch_by_id.cache_clear()
+    return load
+
+def update_garage_capacity(garage_id, capacity):
+    """Returns the number of garages updated"""
+    updated = _submit_update('UPDATE garages SET capacity = ? WHERE id = ?', (capacity, garage_id))
+    get_nearby_garages.cache_clear()
+    _fetch_by_id.cache_clear()
+    return updated
+
 def get_part_by_id(part_id):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM parts_catalog WHERE id = ?", (part_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+    return _fetch_by_id('parts_catalog', part_id)
 
 def update_part_stock(part_id, quantity_change):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE parts_catalog 
-            SET stock_quantity = stock_quantity + ? 
-            WHERE id = ?
-        ''', (quantity_change, part_id))
-        conn.commit()
-        return cursor.rowcount > 0
+    """Returns {'stock_quantity'} after the change, or None if the part does not exist"""
+    stock = _submit_returning('''
+        UPDATE parts_catalog 
+        SET stock_quantity = stock_quantity + ? 
+        WHERE id = ?
+        RETURNING stock_quantity
+    ''', (quantity_change, part_id))
+    _clear_parts_cache()
+    return stock
+
 def get_service_center_by_id(service_center_id):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM service_centers WHERE id = ?", (service_center_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+    return _fetch_by_id('service_centers', service_center_id)
 
 def update_service_center_load(service_center_id, load_change):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE service_centers 
-            SET current_load = current_load + ? 
-            WHERE id = ? AND current_load + ? <= capacity
-        ''', (load_change, service_center_id, load_change))
-        conn.commit()
-        return cursor.rowcount > 0
+    """Returns {'current_load', 'capacity'} after the change, or None if it would exceed capacity"""
+    load = _submit_returning('''
+        UPDATE service_centers 
+        SET current_load = current_load + ? 
+        WHERE id = ? AND current_load + ? <= capacity
+        RETURNING current_load, capacity
+    ''', (load_change, service_center_id, load_change))
+    get_all_service_centers.cache_clear()
+    _fetch_by_id.cache_clear()
+    return load
+
 def get_breakdown_incident_by_id(incident_id):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT b.*, v.vin, v.make, v.model, g.name as garage_name
@@ -786,20 +1502,11 @@ def get_breakdown_incident_by_id(incident_id):
             LEFT JOIN garages g ON b.garage_id = g.id
             WHERE b.id = ?
         ''', (incident_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        return _fetch_dict(cursor)
 
-def complete_breakdown_incident(incident_id, parts_used, total_cost, actual_fix_time):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE breakdown_incidents 
-            SET status = 'completed', parts_used = ?, total_cost = ?, actual_fix_time = ?
-            WHERE id = ?
-        ''', (json.dumps(parts_used) if parts_used else None, total_cost, actual_fix_time, incident_id))
-        conn.commit()
 def get_vehicle_health_trend(vehicle_id, days=30):
-    with get_db_connection() as conn:
+    _try_flush_telemetry()
+    with get_analytics_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT date(timestamp) as date, 
@@ -807,52 +1514,61 @@ def get_vehicle_health_trend(vehicle_id, days=30):
                    AVG(oil_pressure) as avg_oil_pressure,
                    AVG(battery_voltage) as avg_battery_voltage
             FROM telemetry_data
-            WHERE vehicle_id = ? AND timestamp >= date('now', ?)
+            WHERE vehicle_id = ? AND date(timestamp) >= date('now', ?)
             GROUP BY date(timestamp)
             ORDER BY date
         ''', (vehicle_id, f'-{days} days'))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
+
+SQL_MAINTENANCE_HISTORY = '''
+    SELECT b.*, sc.name as service_center_name, f.rating, f.comments
+    FROM bookings b
+    JOIN service_centers sc ON b.service_center_id = sc.id
+    LEFT JOIN feedback f ON b.id = f.booking_id
+    WHERE b.vehicle_id = ? AND b.status = 'completed'
+    ORDER BY b.completed_at DESC
+'''
 
 def get_maintenance_history(vehicle_id):
-    with get_db_connection() as conn:
+    with get_analytics_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT b.*, sc.name as service_center_name, f.rating, f.comments
-            FROM bookings b
-            JOIN service_centers sc ON b.service_center_id = sc.id
-            LEFT JOIN feedback f ON b.id = f.booking_id
-            WHERE b.vehicle_id = ? AND b.status = 'completed'
-            ORDER BY b.completed_at DESC
-        ''', (vehicle_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute(SQL_MAINTENANCE_HISTORY, (vehicle_id,))
+        return _fetch_dicts(cursor)
+
+def iter_maintenance_history(vehicle_id, chunk_size=1024):
+    """Like get_maintenance_history but yields rows in chunks instead of building a list"""
+    with get_analytics_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_MAINTENANCE_HISTORY, (vehicle_id,))
+        yield from _iter_dicts(cursor, chunk_size)
+# Trigrams need at least three characters; shorter terms fall back to LIKE
+FTS_MIN_TERM_LENGTH = 3
+
 def search_vehicles(search_term):
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM vehicles 
-            WHERE vin LIKE ? OR make LIKE ? OR model LIKE ? OR owner_name LIKE ?
-            ORDER BY created_at DESC
-        ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
-        return [dict(row) for row in cursor.fetchall()]
+        if len(search_term) >= FTS_MIN_TERM_LENGTH:
+            # Quoted as one phrase so FTS5 syntax in the term is matched literally
+            cursor.execute('''
+                SELECT v.* FROM vehicles_fts f
+                JOIN vehicles v ON v.id = f.rowid
+                WHERE vehicles_fts MATCH ?
+                ORDER BY v.created_at DESC
+            ''', ('"' + search_term.replace('"', '""') + '"',))
+        else:
+            cursor.execute('''
+                SELECT * FROM vehicles 
+                WHERE vin LIKE ? OR make LIKE ? OR model LIKE ? OR owner_name LIKE ?
+                ORDER BY created_at DESC
+            ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
+        return _fetch_dicts(cursor)
 
 def delete_vehicle(vehicle_id):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM vehicles WHERE id = ?", (vehicle_id,))
-        conn.commit()
-        return cursor.rowcount > 0
-# In database.py - Add these functions:
+    changed = _submit_update("DELETE FROM vehicles WHERE id = ?", (vehicle_id,))
+    get_dashboard_stats.cache_clear()
+    return changed > 0
 
-def update_breakdown_status(incident_id, status, technician_notes=None):
-    """Update breakdown status: 'assigned' → 'in_progress' → 'completed'"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE breakdown_incidents 
-            SET status = ?, technician_notes = ?
-            WHERE id = ?
-        ''', (status, technician_notes, incident_id))
-        conn.commit()
+# In database.py - Add these functions:
 
 def start_breakdown_fix(incident_id, technician_id=None):
     """Garage starts working on the fix"""
@@ -861,90 +1577,116 @@ def start_breakdown_fix(incident_id, technician_id=None):
 
 def complete_breakdown_fix(incident_id, parts_used, total_cost, actual_fix_time, notes):
     """Garage completes the fix"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE breakdown_incidents 
-            SET status = 'completed', 
-                parts_used = ?, 
-                total_cost = ?, 
-                actual_fix_time = ?,
-                technician_notes = ?
-            WHERE id = ?
-        ''', (json.dumps(parts_used), total_cost, actual_fix_time, notes, incident_id))
-        conn.commit()
+    _submit_write('''
+        UPDATE breakdown_incidents 
+        SET status = 'completed', 
+            parts_used = ?, 
+            total_cost = ?, 
+            actual_fix_time = ?,
+            technician_notes = ?,
+            updated_at = CURRENT_TIMESTAMP,
+            completed_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (_dumps(parts_used), total_cost, actual_fix_time, notes, incident_id))
+
+def mark_breakdown_completed(incident_id, total_cost):
+    """Close a job with just its total cost; returns True if the incident exists"""
+    changed = _submit_update('''
+        UPDATE breakdown_incidents 
+        SET status = 'completed', 
+            total_cost = ?,
+            updated_at = CURRENT_TIMESTAMP,
+            completed_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (total_cost, incident_id))
+    return changed > 0
+
 def use_parts_for_breakdown(incident_id, parts_list):
     """Record parts used and update inventory"""
+    stock_rows = [(p['quantity'], p['part_number'], p['quantity']) for p in parts_list]
+    usage_rows = [(incident_id, p['part_number'], p['part_number'], p['part_number'], p['quantity'], p['price']) for p in parts_list]
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        for part in parts_list:
-            # Update inventory
-            cursor.execute('''
-                UPDATE parts_catalog 
-                SET stock_quantity = stock_quantity - ?
-                WHERE part_number = ? AND stock_quantity >= ?
-            ''', (part['quantity'], part['part_number'], part['quantity']))
-            
-            # Record usage
-            cursor.execute('''
-                INSERT INTO parts_usage (incident_id, part_number, quantity, unit_price)
-                VALUES (?, ?, ?, ?)
-            ''', (incident_id, part['part_number'], part['quantity'], part['price']))
+        cursor.execute("BEGIN IMMEDIATE")
+        # Update inventory
+        cursor.executemany('''
+            UPDATE parts_catalog 
+            SET stock_quantity = stock_quantity - ?
+            WHERE part_number = ? AND stock_quantity >= ?
+        ''', stock_rows)
+        if cursor.rowcount < len(stock_rows):
+            # get_db_connection rolls the open transaction back
+            raise ValueError(f"Insufficient stock for breakdown {incident_id}; no parts were used")
+        
+        # Record usage; part_name is required, so take it from the catalog
+        cursor.executemany('''
+            INSERT INTO parts_usage (incident_id, part_number, part_name, quantity, unit_price)
+            VALUES (?, ?, COALESCE((SELECT part_name FROM parts_catalog WHERE part_number = ? LIMIT 1), ?), ?, ?)
+        ''', usage_rows)
         conn.commit()
+        _clear_parts_cache()
 def generate_breakdown_invoice(incident_id):
-    """Create final invoice for breakdown fix"""
-    with get_db_connection() as conn:
+    """Create final invoice for breakdown fix, with the recorded part lines under 'parts'"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
+        # Part lines are aggregated in the same statement rather than fetched per invoice afterwards
         cursor.execute('''
-            SELECT b.*, v.*, g.name as garage_name, g.phone as garage_phone,
-                   p.parts_used, p.labor_cost, p.total_cost
+            SELECT b.id, b.breakdown_type, b.reported_at, b.updated_at, b.actual_fix_time,
+                   b.parts_used, b.total_cost, b.technician_notes,
+                   v.vin, v.make, v.model, v.year, v.owner_name, v.owner_phone,
+                   g.name as garage_name, g.phone as garage_phone,
+                   (SELECT json_group_array(json_object(
+                        'part_number', u.part_number, 'part_name', u.part_name,
+                        'quantity', u.quantity, 'unit_price', u.unit_price, 'total_price', u.total_price))
+                    FROM parts_usage u WHERE u.incident_id = b.id) as parts
             FROM breakdown_incidents b
             JOIN vehicles v ON b.vehicle_id = v.id
             JOIN garages g ON b.garage_id = g.id
-            LEFT JOIN breakdown_payments p ON b.id = p.incident_id
             WHERE b.id = ?
         ''', (incident_id,))
-        return dict(cursor.fetchone())
+        invoice = _fetch_dict(cursor)
+        if invoice is not None:
+            invoice['parts'] = orjson.loads(invoice['parts'])
+        return invoice
 # Add to database.py
 
 def get_all_garages():
     """Get all garages"""
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM garages ORDER BY name")
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
 def get_active_breakdowns_for_garage(garage_id):
     """Get active breakdowns for a specific garage"""
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT b.*, v.make, v.model, v.year, v.owner_name, v.owner_phone, v.vin
+        cursor.execute(f'''
+            SELECT {BREAKDOWN_CARD_COLUMNS}
             FROM breakdown_incidents b
             JOIN vehicles v ON b.vehicle_id = v.id
             WHERE b.garage_id = ? AND b.status IN ('assigned', 'in_progress', 'on_hold')
             ORDER BY b.reported_at ASC
         ''', (garage_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
 def get_breakdowns_by_garage_and_status(garage_id, status_list):
     """Get breakdowns by garage and status"""
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        placeholders = ','.join(['?'] * len(status_list))
-        query = f'''
-            SELECT b.*, v.make, v.model, v.year, v.owner_name, v.owner_phone, v.vin
+        # One fixed statement for any number of statuses keeps the statement cache warm
+        cursor.execute(f'''
+            SELECT {BREAKDOWN_CARD_COLUMNS}
             FROM breakdown_incidents b
             JOIN vehicles v ON b.vehicle_id = v.id
-            WHERE b.garage_id = ? AND b.status IN ({placeholders})
+            WHERE b.garage_id = ? AND b.status IN (SELECT value FROM json_each(?))
             ORDER BY b.reported_at ASC
-        '''
-        cursor.execute(query, [garage_id] + status_list)
-        return [dict(row) for row in cursor.fetchall()]
+        ''', (garage_id, _dumps(list(status_list))))
+        return _fetch_dicts(cursor)
 
 def get_completed_breakdowns_today(garage_id):
     """Get number of breakdowns completed today"""
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT COUNT(*) FROM breakdown_incidents 
@@ -953,199 +1695,177 @@ def get_completed_breakdowns_today(garage_id):
         ''', (garage_id,))
         return cursor.fetchone()[0]
 
-# Add tables for technicians and parts_usage
-def init_database():
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # ... existing table creation code ...
-        
-        # Add technicians table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS technicians (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                garage_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                specialization TEXT,
-                contact TEXT NOT NULL,
-                experience_years INTEGER DEFAULT 0,
-                status TEXT DEFAULT 'available',
-                current_incident_id INTEGER,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (garage_id) REFERENCES garages(id),
-                FOREIGN KEY (current_incident_id) REFERENCES breakdown_incidents(id)
-            )
-        ''')
-        
-        # Add parts_usage table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS parts_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                incident_id INTEGER NOT NULL,
-                part_number TEXT NOT NULL,
-                part_name TEXT NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                unit_price REAL NOT NULL,
-                total_price REAL GENERATED ALWAYS AS (quantity * unit_price) VIRTUAL,
-                used_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (incident_id) REFERENCES breakdown_incidents(id)
-            )
-        ''')
-        
-        conn.commit()
-
 def create_technician(garage_id, name, specialization, contact, experience_years):
     """Add a new technician"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO technicians (garage_id, name, specialization, contact, experience_years)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (garage_id, name, specialization, contact, experience_years))
-        conn.commit()
-        return cursor.lastrowid
+    technician_id = _submit_write('''
+        INSERT INTO technicians (garage_id, name, specialization, contact, experience_years)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (garage_id, name, specialization, contact, experience_years))
+    _fetch_by_id.cache_clear()
+    return technician_id
 
 def get_technician_by_id(technician_id):
     """Get technician by ID"""
-    with get_db_connection() as conn:
+    return _fetch_by_id('technicians', technician_id)
+
+def get_garage_technicians(garage_id):
+    """Get a garage's technicians"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM technicians WHERE id = ?", (technician_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        cursor.execute("SELECT * FROM technicians WHERE garage_id = ? ORDER BY name", (garage_id,))
+        return _fetch_dicts(cursor)
+
+def assign_technician(incident_id, technician_id):
+    """Put a technician on a breakdown; returns True if the technician exists"""
+    changed = _submit_update('''
+        UPDATE technicians SET status = 'busy', current_incident_id = ? WHERE id = ?
+    ''', (incident_id, technician_id))
+    _fetch_by_id.cache_clear()
+    return changed > 0
 
 def get_garage_analytics(garage_id):
     """Get analytics for a garage"""
-    with get_db_connection() as conn:
+    with get_analytics_connection() as conn:
         cursor = conn.cursor()
-        
-        # Get monthly completions
-        cursor.execute('''
-            SELECT strftime('%Y-%m', completed_at) as month, 
-                   COUNT(*) as count,
-                   SUM(total_cost) as revenue
-            FROM breakdown_incidents
-            WHERE garage_id = ? AND status = 'completed' AND completed_at IS NOT NULL
-            GROUP BY strftime('%Y-%m', completed_at)
-            ORDER BY month DESC
-            LIMIT 6
-        ''', (garage_id,))
-        
-        monthly_data = cursor.fetchall()
-        monthly_completions = {row['month']: row['count'] for row in monthly_data}
-        monthly_revenue = {row['month']: row['revenue'] or 0 for row in monthly_data}
-        
-        # Get average response time
+        # Monthly completions and the overall response time in one statement.
+        # resp always yields one row, so the average survives a garage with no completions.
         cursor.execute('''
-            SELECT AVG(
-                (julianday(updated_at) - julianday(reported_at)) * 24 * 60
-            ) as avg_response_time
-            FROM breakdown_incidents
-            WHERE garage_id = ? AND status = 'completed'
-        ''', (garage_id,))
+            WITH monthly AS (
+                SELECT strftime('%Y-%m', completed_at) AS month,
+                       COUNT(*) AS count,
+                       SUM(total_cost) AS revenue
+                FROM breakdown_incidents
+                WHERE garage_id = ? AND status = 'completed' AND completed_at IS NOT NULL
+                GROUP BY month
+                ORDER BY month DESC
+                LIMIT 6
+            ),
+            resp AS (
+                SELECT AVG((julianday(completed_at) - julianday(reported_at)) * 24 * 60) AS avg_response_time
+                FROM breakdown_incidents
+                WHERE garage_id = ? AND status = 'completed'
+            )
+            SELECT resp.avg_response_time, monthly.month, monthly.count, monthly.revenue
+            FROM resp LEFT JOIN monthly
+            ORDER BY monthly.month DESC
+        ''', (garage_id, garage_id))
         
-        avg_response_time = cursor.fetchone()[0] or 0
+        monthly_completions = {}
+        monthly_revenue = {}
+        avg_response_time = 0
+        for avg_response_time, month, count, revenue in cursor.fetchall():
+            if month is not None:
+                monthly_completions[month] = count
+                monthly_revenue[month] = revenue or 0
         
         return {
             'monthly_completions': monthly_completions,
             'monthly_revenue': monthly_revenue,
-            'avg_response_time': avg_response_time,
+            'avg_response_time': avg_response_time or 0,
             'response_rate': 95  # Placeholder
         }
 
 def get_garage_feedback(garage_id):
     """Get feedback for garage's completed jobs"""
-    with get_db_connection() as conn:
+    with get_analytics_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT f.*, v.make, v.model
             FROM feedback f
             JOIN bookings b ON f.booking_id = b.id
             JOIN vehicles v ON f.vehicle_id = v.id
-            JOIN breakdown_incidents bi ON b.vehicle_id = v.id
-            WHERE bi.garage_id = ?
+            WHERE EXISTS (
+                SELECT 1 FROM breakdown_incidents bi
+                WHERE bi.vehicle_id = v.id AND bi.garage_id = ?
+            )
             ORDER BY f.created_at DESC
             LIMIT 10
         ''', (garage_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
-# Add this to database.py (if not already there)
+def _breakdown_status_counts(cursor, garage_id):
+    cursor.execute('''
+        SELECT status, COUNT(*) FROM breakdown_incidents
+        WHERE garage_id = ?
+        GROUP BY status
+    ''', (garage_id,))
+    return {row[0]: row[1] for row in cursor.fetchall()}
 
-def get_all_garages():
-    """Get all garages"""
-    with get_db_connection() as conn:
+def get_breakdown_status_counts(garage_id):
+    """Get the number of breakdowns per status for a garage"""
+    with get_reader_connection() as conn:
+        return _breakdown_status_counts(conn.cursor(), garage_id)
+
+def get_garage_dashboard_state(garage_id, limit=50, offset=0):
+    """Load a garage, one page of its breakdown jobs and per-status job counts over one connection"""
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM garages ORDER BY name")
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute("SELECT * FROM garages WHERE id = ?", (garage_id,))
+        garage = _fetch_dict(cursor)
+        
+        cursor.execute(f'''
+            SELECT {BREAKDOWN_CARD_COLUMNS}
+            FROM breakdown_incidents b
+            JOIN vehicles v ON b.vehicle_id = v.id
+            WHERE b.garage_id = ? 
+            ORDER BY b.reported_at DESC
+            LIMIT ? OFFSET ?
+        ''', (garage_id, limit, offset))
+        breakdowns = _fetch_dicts(cursor)
+        
+        status_counts = _breakdown_status_counts(cursor, garage_id)
+        
+        return {
+            'garage': garage,
+            'breakdowns': breakdowns,
+            'status_counts': status_counts
+        }
 
 def get_breakdowns_for_garage(garage_id):
     """Get all breakdowns for a specific garage"""
-    with get_db_connection() as conn:
+    with get_reader_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT b.*, v.make, v.model, v.year, v.owner_name, v.owner_phone, v.vin
+        cursor.execute(f'''
+            SELECT {BREAKDOWN_CARD_COLUMNS}
             FROM breakdown_incidents b
             JOIN vehicles v ON b.vehicle_id = v.id
             WHERE b.garage_id = ? 
-            ORDER BY 
-                CASE b.status 
-                    WHEN 'in_progress' THEN 1
-                    WHEN 'assigned' THEN 2
-                    WHEN 'reported' THEN 3
-                    WHEN 'completed' THEN 4
-                    ELSE 5
-                END,
-                b.reported_at ASC
+            ORDER BY b.status_rank, b.reported_at ASC
         ''', (garage_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return _fetch_dicts(cursor)
 
 def update_breakdown_status(incident_id, status, technician_notes=None):
-    """Update breakdown status"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE breakdown_incidents 
-            SET status = ?, technician_notes = ?
-            WHERE id = ?
-        ''', (status, technician_notes, incident_id))
-        conn.commit()
-        return cursor.rowcount > 0
-def update_breakdown_status(incident_id, status, technician_notes=None):
-    """Update breakdown status"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        if technician_notes:
-            cursor.execute('''
-                UPDATE breakdown_incidents 
-                SET status = ?, technician_notes = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (status, technician_notes, incident_id))
-        else:
-            cursor.execute('''
-                UPDATE breakdown_incidents 
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (status, incident_id))
-        conn.commit()
-        return cursor.rowcount > 0
+    """Update breakdown status: 'assigned' → 'in_progress' → 'completed'.
+    Empty or missing technician_notes leave the stored notes untouched."""
+    changed = _submit_update('''
+        UPDATE breakdown_incidents 
+        SET status = ?, technician_notes = COALESCE(NULLIF(?, ''), technician_notes), updated_at = CURRENT_TIMESTAMP,
+            completed_at = CASE WHEN ? = 'completed' THEN CURRENT_TIMESTAMP ELSE completed_at END
+        WHERE id = ?
+    ''', (status, technician_notes, status, incident_id))
+    return changed > 0
+
 def complete_breakdown_incident(incident_id, parts_used, total_cost, actual_fix_time, technician_notes=None):
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE breakdown_incidents 
-            SET status = 'completed', 
-                parts_used = ?, 
-                total_cost = ?, 
-                actual_fix_time = ?,
-                technician_notes = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (json.dumps(parts_used) if parts_used else None, 
-              total_cost, actual_fix_time, technician_notes, incident_id))
-        conn.commit()
+    _submit_write('''
+        UPDATE breakdown_incidents 
+        SET status = 'completed', 
+            parts_used = ?, 
+            total_cost = ?, 
+            actual_fix_time = ?,
+            technician_notes = ?,
+            updated_at = CURRENT_TIMESTAMP,
+            completed_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (_dumps(parts_used) if parts_used else None, 
+          total_cost, actual_fix_time, technician_notes, incident_id))
+
 def update_database_schema():
     """Add missing columns to existing tables"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
         
         try:
             # Add technician_notes column to breakdown_incidents if it doesn't exist
@@ -1162,7 +1882,7 @@ def update_database_schema():
             if 'updated_at' not in columns:
                 cursor.execute('''
                     ALTER TABLE breakdown_incidents 
-                    ADD COLUMN updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    ADD COLUMN updated_at TEXT
                 ''')
                 print("Added updated_at column to breakdown_incidents")
             
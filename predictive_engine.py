@@ -1,10 +1,10 @@
 import numpy as np
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier, IsolationForest
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import json
+import threading
 
 class PredictiveMaintenanceEngine:
     
@@ -41,54 +41,83 @@ class PredictiveMaintenanceEngine:
         }
     }
     
+    INDICATOR_NORMAL_RANGES = {
+        'engine_temp': (85, 105),
+        'oil_pressure': (25, 65),
+        'battery_voltage': (12.4, 14.7),
+        'rpm': (800, 6500),
+        'speed': (0, 120),
+        'vibration_level': (0.1, 2.0),
+        'brake_wear': (0, 30),
+        'coolant_temp': (80, 100),
+        'tire_pressure_fl': (30, 35),
+        'tire_pressure_fr': (30, 35),
+        'tire_pressure_rl': (30, 35),
+        'tire_pressure_rr': (30, 35)
+    }
+    
+    HEALTH_STATUSES = ('normal', 'warning', 'critical')
+    
+    RECOMMENDATION_REASON = 'Health score: %s%%, Risk: %.1f%%'
+    
+    # Synthetic training distributions, in prepare_features order: (normal mean, normal std, anomaly mean, anomaly std)
+    TRAINING_PROFILES = {
+        'engine_temp': (95, 5, 115, 10),
+        'oil_pressure': (45, 10, 20, 5),
+        'battery_voltage': (13.5, 0.5, 11.0, 0.8),
+        'rpm': (3000, 1000, 5500, 800),
+        'speed': (60, 20, 40, 30),
+        'vibration_level': (1.0, 0.3, 3.5, 1.0),
+        'brake_wear': (20, 10, 65, 15),
+        'coolant_temp': (90, 5, 115, 8),
+        'tire_pressure_avg': (32, 1, 28, 3)
+    }
+    
     def __init__(self):
         self.scaler = StandardScaler()
         self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
         self.failure_predictor = RandomForestClassifier(n_estimators=100, random_state=42)
         self.is_trained = False
+        
+        # Indicator ranges as aligned arrays, and each component's indicators as positions into them,
+        # so analyze_component_health scores every indicator in one vector pass
+        self._indicator_names = tuple(self.INDICATOR_NORMAL_RANGES)
+        ranges = np.array(list(self.INDICATOR_NORMAL_RANGES.values()), dtype=float)
+        self._indicator_min = ranges[:, 0]
+        self._indicator_max = ranges[:, 1]
+        self._indicator_mid = (self._indicator_min + self._indicator_max) / 2
+        self._indicator_half_range = (self._indicator_max - self._indicator_min) / 2
+        self._component_indicator_idx = {
+            component: tuple(self._indicator_names.index(name) for name in config['indicators'])
+            for component, config in self.COMPONENT_FAILURE_PATTERNS.items()
+        }
+        # Recommendation actions only vary by component: (critical action, warning action)
+        self._recommendation_actions = {
+            component: (f'Immediate inspection required for {component}', f'Schedule maintenance for {component}')
+            for component in self.COMPONENT_FAILURE_PATTERNS
+        }
+        
         self._generate_synthetic_training_data()
     
     def _generate_synthetic_training_data(self):
-        np.random.seed(42)
+        # A private seeded Generator: one draw per class, and the global NumPy RNG is left alone
+        rng = np.random.default_rng(42)
         n_samples = 1000
-        
-        normal_data = {
-            'engine_temp': np.random.normal(95, 5, n_samples),
-            'oil_pressure': np.random.normal(45, 10, n_samples),
-            'battery_voltage': np.random.normal(13.5, 0.5, n_samples),
-            'rpm': np.random.normal(3000, 1000, n_samples),
-            'speed': np.random.normal(60, 20, n_samples),
-            'vibration_level': np.random.normal(1.0, 0.3, n_samples),
-            'brake_wear': np.random.normal(20, 10, n_samples),
-            'coolant_temp': np.random.normal(90, 5, n_samples),
-            'tire_pressure_avg': np.random.normal(32, 1, n_samples)
-        }
-        
         n_anomalies = 200
-        anomaly_data = {
-            'engine_temp': np.random.normal(115, 10, n_anomalies),
-            'oil_pressure': np.random.normal(20, 5, n_anomalies),
-            'battery_voltage': np.random.normal(11.0, 0.8, n_anomalies),
-            'rpm': np.random.normal(5500, 800, n_anomalies),
-            'speed': np.random.normal(40, 30, n_anomalies),
-            'vibration_level': np.random.normal(3.5, 1.0, n_anomalies),
-            'brake_wear': np.random.normal(65, 15, n_anomalies),
-            'coolant_temp': np.random.normal(115, 8, n_anomalies),
-            'tire_pressure_avg': np.random.normal(28, 3, n_anomalies)
-        }
         
-        normal_df = pd.DataFrame(normal_data)
-        normal_df['label'] = 0
+        profiles = np.array(list(self.TRAINING_PROFILES.values()), dtype=float)
+        n_features = len(profiles)
         
-        anomaly_df = pd.DataFrame(anomaly_data)
-        anomaly_df['label'] = 1
-        
-        self.training_data = pd.concat([normal_df, anomaly_df], ignore_index=True)
-        
-        X = self.training_data.drop('label', axis=1)
-        y = self.training_data['label']
+        X = np.vstack([
+            rng.normal(profiles[:, 0], profiles[:, 1], (n_samples, n_features)),
+            rng.normal(profiles[:, 2], profiles[:, 3], (n_anomalies, n_features))
+        ])
+        y = np.concatenate([np.zeros(n_samples, dtype=int), np.ones(n_anomalies, dtype=int)])
         
         self.scaler.fit(X)
+        # scaler.transform re-validates its input on every call; scoring applies the fitted affine directly
+        self._scale_mean = self.scaler.mean_
+        self._scale_inv_std = 1.0 / self.scaler.scale_
         X_scaled = self.scaler.transform(X)
         
         self.anomaly_detector.fit(X_scaled)
@@ -96,14 +125,18 @@ class PredictiveMaintenanceEngine:
         self.is_trained = True
     
     def prepare_features(self, telemetry: Dict) -> np.ndarray:
-        tire_pressures = [
-            telemetry.get('tire_pressure_fl', 32),
-            telemetry.get('tire_pressure_fr', 32),
-            telemetry.get('tire_pressure_rl', 32),
+        # Built directly as the 1x9 row the models take
+        return np.array([self._feature_row(telemetry)], dtype=float)
+    
+    def _feature_row(self, telemetry: Dict) -> List[float]:
+        tire_pressure_avg = (
+            telemetry.get('tire_pressure_fl', 32) +
+            telemetry.get('tire_pressure_fr', 32) +
+            telemetry.get('tire_pressure_rl', 32) +
             telemetry.get('tire_pressure_rr', 32)
-        ]
+        ) / 4
         
-        features = np.array([
+        return [
             telemetry.get('engine_temp', 95),
             telemetry.get('oil_pressure', 45),
             telemetry.get('battery_voltage', 13.5),
@@ -112,73 +145,110 @@ class PredictiveMaintenanceEngine:
             telemetry.get('vibration_level', 1.0),
             telemetry.get('brake_wear', 20),
             telemetry.get('coolant_temp', 90),
-            np.mean(tire_pressures)
-        ]).reshape(1, -1)
-        
-        return features
+            tire_pressure_avg
+        ]
     
-    def detect_anomalies(self, telemetry: Dict) -> Dict:
-        features = self.prepare_features(telemetry)
-        features_scaled = self.scaler.transform(features)
-        
-        anomaly_score = self.anomaly_detector.decision_function(features_scaled)[0]
-        is_anomaly = self.anomaly_detector.predict(features_scaled)[0] == -1
-        
-        anomaly_probability = 1 / (1 + np.exp(anomaly_score * 2))
-        
-        return {
-            'is_anomaly': is_anomaly,
-            'anomaly_score': float(anomaly_score),
-            'anomaly_probability': float(anomaly_probability),
-            'confidence': float(abs(anomaly_score) / 0.5) if abs(anomaly_score) < 0.5 else 1.0
-        }
+    def _scale_features(self, features: np.ndarray) -> np.ndarray:
+        return (features - self._scale_mean) * self._scale_inv_std
     
-    def predict_failure(self, telemetry: Dict) -> Dict:
-        features = self.prepare_features(telemetry)
-        features_scaled = self.scaler.transform(features)
-        
-        failure_proba = self.failure_predictor.predict_proba(features_scaled)[0]
-        failure_probability = failure_proba[1] if len(failure_proba) > 1 else 0.0
+    def detect_anomalies(self, telemetry: Dict, features_scaled: Optional[np.ndarray] = None) -> Dict:
+        if features_scaled is None:
+            features_scaled = self._scale_features(self.prepare_features(telemetry))
+        return self._anomaly_results(features_scaled)[0]
+    
+    def _anomaly_results(self, features_scaled: np.ndarray) -> List[Dict]:
+        anomaly_scores = self.anomaly_detector.decision_function(features_scaled)
+        # IsolationForest.predict is just decision_function < 0, so reuse the scores instead of walking the trees twice
+        anomaly_probabilities = 1 / (1 + np.exp(anomaly_scores * 2))
+        confidences = np.minimum(np.abs(anomaly_scores) / 0.5, 1.0)
         
-        risk_level = 'low'
-        if failure_probability >= 0.7:
-            risk_level = 'critical'
-        elif failure_probability >= 0.4:
-            risk_level = 'high'
-        elif failure_probability >= 0.2:
-            risk_level = 'medium'
+        return [
+            {
+                'is_anomaly': anomaly_score < 0,
+                'anomaly_score': anomaly_score,
+                'anomaly_probability': anomaly_probability,
+                'confidence': confidence
+            }
+            for anomaly_score, anomaly_probability, confidence in zip(
+                anomaly_scores.tolist(), anomaly_probabilities.tolist(), confidences.tolist()
+            )
+        ]
+    
+    def predict_failure(self, telemetry: Dict, features_scaled: Optional[np.ndarray] = None) -> Dict:
+        if features_scaled is None:
+            features_scaled = self._scale_features(self.prepare_features(telemetry))
+        return self._failure_results(features_scaled)[0]
+    
+    def _failure_results(self, features_scaled: np.ndarray) -> List[Dict]:
+        failure_proba = self.failure_predictor.predict_proba(features_scaled)
+        failure_probabilities = failure_proba[:, 1] if failure_proba.shape[1] > 1 else np.zeros(len(failure_proba))
+        confidences = failure_proba.max(axis=1)
         
-        return {
-            'failure_probability': float(failure_probability),
-            'risk_level': risk_level,
-            'confidence': float(max(failure_proba))
-        }
+        results = []
+        for failure_probability, confidence in zip(failure_probabilities.tolist(), confidences.tolist()):
+            risk_level = 'low'
+            if failure_probability >= 0.7:
+                risk_level = 'critical'
+            elif failure_probability >= 0.4:
+                risk_level = 'high'
+            elif failure_probability >= 0.2:
+                risk_level = 'medium'
+            
+            results.append({
+                'failure_probability': failure_probability,
+                'risk_level': risk_level,
+                'confidence': confidence
+            })
+        return results
     
     def analyze_component_health(self, telemetry: Dict) -> Dict[str, Dict]:
+        return self._component_health_batch([telemetry])[0]
+    
+    def _component_health_batch(self, telemetries: List[Dict]) -> List[Dict[str, Dict]]:
+        # Score all indicators of every record at once. Deviation is the distance from the midpoint in
+        # half-ranges inside the normal range and excess over the bound + 1 outside it; the two forms are
+        # equal algebraically but not always in floating point, so each is kept where it applies.
+        # Missing readings come through as NaN and are skipped per component
+        raw_values = [[telemetry.get(name) for name in self._indicator_names] for telemetry in telemetries]
+        values = np.array(raw_values, dtype=float).reshape(len(telemetries), len(self._indicator_names))
+        excess = np.maximum(values - self._indicator_max, 0) + np.maximum(self._indicator_min - values, 0)
+        deviations = np.where(
+            excess > 0,
+            excess / self._indicator_half_range + 1,
+            np.abs(values - self._indicator_mid) / self._indicator_half_range
+        )
+        scores = np.maximum(0, 100 - deviations * 30)
+        status_idx = ((scores < 70).astype(int) + (scores < 50)).tolist()
+        now = datetime.now()
+        
+        return [
+            self._component_health(*row, now)
+            for row in zip(raw_values, scores.tolist(), deviations.tolist(), status_idx)
+        ]
+    
+    def _component_health(self, raw_values: List, scores: List[float], deviations: List[float],
+                          status_idx: List[int], now: datetime) -> Dict[str, Dict]:
         component_health = {}
         
         for component, config in self.COMPONENT_FAILURE_PATTERNS.items():
-            indicators = config['indicators']
             threshold = config['failure_threshold']
             mtbf = config['mtbf_days']
             
             health_scores = []
             issues = []
             
-            for indicator in indicators:
-                value = telemetry.get(indicator)
-                if value is None:
+            for i in self._component_indicator_idx[component]:
+                if raw_values[i] is None:
                     continue
                 
-                indicator_health = self._calculate_indicator_health(indicator, value)
-                health_scores.append(indicator_health['score'])
+                health_scores.append(round(scores[i], 1))
                 
-                if indicator_health['status'] != 'normal':
+                if status_idx[i]:
                     issues.append({
-                        'indicator': indicator,
-                        'value': value,
-                        'status': indicator_health['status'],
-                        'deviation': indicator_health['deviation']
+                        'indicator': self._indicator_names[i],
+                        'value': raw_values[i],
+                        'status': self.HEALTH_STATUSES[status_idx[i]],
+                        'deviation': round(deviations[i], 2)
                     })
             
             if health_scores:
@@ -190,7 +260,7 @@ class PredictiveMaintenanceEngine:
                 else:
                     days_to_failure = int(mtbf * (1 - failure_risk))
                 
-                predicted_failure_date = datetime.now() + timedelta(days=max(1, days_to_failure))
+                predicted_failure_date = now + timedelta(days=max(1, days_to_failure))
                 
                 status = 'healthy'
                 if avg_health < 50:
@@ -210,81 +280,70 @@ class PredictiveMaintenanceEngine:
         
         return component_health
     
-    def _calculate_indicator_health(self, indicator: str, value: float) -> Dict:
-        normal_ranges = {
-            'engine_temp': (85, 105),
-            'oil_pressure': (25, 65),
-            'battery_voltage': (12.4, 14.7),
-            'rpm': (800, 6500),
-            'speed': (0, 120),
-            'vibration_level': (0.1, 2.0),
-            'brake_wear': (0, 30),
-            'coolant_temp': (80, 100),
-            'tire_pressure_fl': (30, 35),
-            'tire_pressure_fr': (30, 35),
-            'tire_pressure_rl': (30, 35),
-            'tire_pressure_rr': (30, 35)
-        }
-        
-        if indicator not in normal_ranges:
-            return {'score': 85, 'status': 'unknown', 'deviation': 0}
-        
-        min_val, max_val = normal_ranges[indicator]
-        mid_val = (min_val + max_val) / 2
-        range_size = max_val - min_val
-        
-        deviation = abs(value - mid_val) / (range_size / 2)
-        
-        if value < min_val:
-            deviation = (min_val - value) / (range_size * 0.5) + 1
-        elif value > max_val:
-            deviation = (value - max_val) / (range_size * 0.5) + 1
-        
-        score = max(0, 100 - (deviation * 30))
-        
-        status = 'normal'
-        if score < 50:
-            status = 'critical'
-        elif score < 70:
-            status = 'warning'
-        
-        return {
-            'score': round(score, 1),
-            'status': status,
-            'deviation': round(deviation, 2)
-        }
-    
     def generate_prediction_report(self, telemetry: Dict, vehicle_info: Dict = None) -> Dict:
-        anomaly_result = self.detect_anomalies(telemetry)
-        failure_result = self.predict_failure(telemetry)
-        component_health = self.analyze_component_health(telemetry)
-        
-        critical_components = [c for c, h in component_health.items() if h['status'] == 'critical']
-        warning_components = [c for c, h in component_health.items() if h['status'] == 'warning']
-        
-        overall_health = np.mean([h['health_score'] for h in component_health.values()]) if component_health else 100
+        # Both models score the same row, so prepare and scale it once
+        features_scaled = self._scale_features(self.prepare_features(telemetry))
+        return self._build_report(
+            self.detect_anomalies(telemetry, features_scaled),
+            self.predict_failure(telemetry, features_scaled),
+            self.analyze_component_health(telemetry),
+            vehicle_info
+        )
+    
+    def generate_prediction_report_batch(self, telemetries: List[Dict], vehicle_infos: List[Dict] = None) -> List[Dict]:
+        """generate_prediction_report for many records: features are scaled together and each model
+        scores the whole batch in one call, so sklearn's per-call overhead is paid once"""
+        if vehicle_infos is None:
+            vehicle_infos = [None] * len(telemetries)
+        elif len(vehicle_infos) != len(telemetries):
+            raise ValueError(f"Got {len(vehicle_infos)} vehicle_infos for {len(telemetries)} telemetry records")
+        if not telemetries:
+            return []
         
-        recommendations = []
+        features_scaled = self._scale_features(np.array([self._feature_row(t) for t in telemetries], dtype=float))
+        return [
+            self._build_report(anomaly_result, failure_result, component_health, vehicle_info)
+            for anomaly_result, failure_result, component_health, vehicle_info in zip(
+                self._anomaly_results(features_scaled),
+                self._failure_results(features_scaled),
+                self._component_health_batch(telemetries),
+                vehicle_infos
+            )
+        ]
+    
+    def _build_report(self, anomaly_result: Dict, failure_result: Dict, component_health: Dict[str, Dict],
+                      vehicle_info: Optional[Dict]) -> Dict:
+        # One pass sorts components by status and builds their recommendations; high-priority ones
+        # are collected separately and go first, which is the order the old stable sort produced
+        critical_components = []
+        warning_components = []
+        high_priority = []
+        medium_priority = []
+        health_total = 0
         
         for component, health in component_health.items():
+            health_total += health['health_score']
             if health['status'] == 'critical':
-                recommendations.append({
+                critical_components.append(component)
+                high_priority.append({
                     'priority': 'high',
                     'component': component,
-                    'action': f'Immediate inspection required for {component}',
-                    'reason': f'Health score: {health["health_score"]}%, Risk: {health["failure_risk"]*100:.1f}%',
+                    'action': self._recommendation_actions[component][0],
+                    'reason': self.RECOMMENDATION_REASON % (health['health_score'], health['failure_risk'] * 100),
                     'deadline': health['predicted_failure_date']
                 })
             elif health['status'] == 'warning':
-                recommendations.append({
+                warning_components.append(component)
+                medium_priority.append({
                     'priority': 'medium',
                     'component': component,
-                    'action': f'Schedule maintenance for {component}',
-                    'reason': f'Health score: {health["health_score"]}%, Risk: {health["failure_risk"]*100:.1f}%',
+                    'action': self._recommendation_actions[component][1],
+                    'reason': self.RECOMMENDATION_REASON % (health['health_score'], health['failure_risk'] * 100),
                     'deadline': health['predicted_failure_date']
                 })
         
-        recommendations.sort(key=lambda x: 0 if x['priority'] == 'high' else 1)
+        overall_health = health_total / len(component_health) if component_health else 100
+        recommendations = high_priority + medium_priority
         
         return {
             'timestamp': datetime.now().isoformat(),
@@ -299,5 +358,14 @@ class PredictiveMaintenanceEngine:
             'requires_immediate_attention': len(critical_components) > 0 or failure_result['risk_level'] == 'critical'
         }
 
+# Training is seeded and the engine is read-only once fit, so one instance serves every caller
+_engine = None
+_engine_lock = threading.Lock()
+
 def get_prediction_engine() -> PredictiveMaintenanceEngine:
-    return PredictiveMaintenanceEngine()
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PredictiveMaintenanceEngine()
+    return _engine
@@ -52,6 +52,24 @@ class TelemetrySimulator:
         'B1000': 'ECU Malfunction',
         'U0100': 'Lost Communication With ECM/PCM'
     }
+    _ERROR_CODE_KEYS = tuple(ERROR_CODES)
+    
+    # Decimal places generate_telemetry rounds each reading to (None: drawn as an integer), in output order
+    READING_DECIMALS = {
+        'engine_temp': 1,
+        'oil_pressure': 1,
+        'battery_voltage': 2,
+        'rpm': None,
+        'speed': None,
+        'vibration_level': 2,
+        'brake_wear': 1,
+        'tire_pressure_fl': 1,
+        'tire_pressure_fr': 1,
+        'tire_pressure_rl': 1,
+        'tire_pressure_rr': 1,
+        'fuel_level': 1,
+        'coolant_temp': 1
+    }
     
     def __init__(self, vehicle_id: int, scenario: str = 'normal'):
         self.vehicle_id = vehicle_id
@@ -69,7 +87,7 @@ class TelemetrySimulator:
             self.degradation_factor = random.uniform(0, 0.5)
             self.error_probability = random.uniform(0.01, 0.1)
     
-    def generate_telemetry(self) -> Dict:
+    def generate_telemetry(self, timestamp: Optional[str] = None) -> Dict:
         engine_temp = self._generate_with_degradation('engine_temp', bias_high=True)
         oil_pressure = self._generate_with_degradation('oil_pressure', bias_high=False)
         battery_voltage = self._generate_with_degradation('battery_voltage', bias_high=False)
@@ -87,7 +105,7 @@ class TelemetrySimulator:
         
         return {
             'vehicle_id': self.vehicle_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
             'engine_temp': round(engine_temp, 1),
             'oil_pressure': round(oil_pressure, 1),
             'battery_voltage': round(battery_voltage, 2),
@@ -104,6 +122,99 @@ class TelemetrySimulator:
             'error_codes': error_codes
         }
     
+    @classmethod
+    def generate_batch(cls, vehicle_ids: List[int], scenarios: List[str], rng: Optional[np.random.Generator] = None) -> List[Dict]:
+        """generate_telemetry for many vehicles at once: each parameter is drawn for the whole batch
+        in one NumPy call, and only the output dicts are built per vehicle"""
+        rng = rng or np.random.default_rng()
+        n = len(vehicle_ids)
+        scenarios = np.asarray(scenarios)
+        
+        # Same per-scenario profiles as __init__
+        degradation = np.zeros(n)
+        error_probability = np.full(n, 0.01)
+        for scenario, (low, high), probability in (
+            ('degrading', (0.1, 0.3), 0.05),
+            ('critical', (0.4, 0.7), 0.15),
+        ):
+            mask = scenarios == scenario
+            degradation[mask] = rng.uniform(low, high, mask.sum())
+            error_probability[mask] = probability
+        mask = scenarios == 'random'
+        degradation[mask] = rng.uniform(0, 0.5, mask.sum())
+        error_probability[mask] = rng.uniform(0.01, 0.1, mask.sum())
+        
+        columns = cls._generate_columns(n, degradation, error_probability, rng)
+        timestamp = datetime.now().isoformat()
+        
+        fields = list(cls.READING_DECIMALS)
+        readings = [
+            columns[field].tolist() if decimals is None else np.round(columns[field], decimals).tolist()
+            for field, decimals in cls.READING_DECIMALS.items()
+        ]
+        return [
+            {'vehicle_id': vehicle_id, 'timestamp': timestamp, **dict(zip(fields, row)), 'error_codes': error_codes}
+            for vehicle_id, error_codes, *row in zip(vehicle_ids, columns['error_codes'], *readings)
+        ]
+    
+    def generate_telemetry_soa(self, n: int, rng: Optional[np.random.Generator] = None) -> Dict:
+        """n readings from this simulator as one array per parameter instead of n dicts: float32 readings
+        rounded as in generate_telemetry, int32 rpm/speed, and error_codes as a list of lists"""
+        rng = rng or np.random.default_rng()
+        columns = self._generate_columns(n, np.full(n, self.degradation_factor), np.full(n, self.error_probability), rng)
+        
+        soa = {
+            field: columns[field].astype(np.int32) if decimals is None else np.round(columns[field], decimals).astype(np.float32)
+            for field, decimals in self.READING_DECIMALS.items()
+        }
+        soa['error_codes'] = columns['error_codes']
+        return soa
+    
+    @classmethod
+    def _generate_columns(cls, n: int, degradation: np.ndarray, error_probability: np.ndarray,
+                          rng: np.random.Generator) -> Dict:
+        """Unrounded readings for n vehicles as one array per parameter, following the same
+        distributions as the per-vehicle _generate_* helpers"""
+        def degraded(param, bias_high):
+            min_val, max_val = cls.NORMAL_RANGES[param]
+            span = max_val - min_val
+            values = rng.uniform(min_val, max_val, n)
+            shift = span * degradation * rng.uniform(0.5, 1.5, n)
+            values += shift if bias_high else -shift
+            return values + rng.normal(0, span * 0.05, n)
+        
+        rpm = rng.integers(*cls.NORMAL_RANGES['rpm'], size=n, endpoint=True)
+        speed = np.where(rpm < 2000, rng.integers(0, 80, n, endpoint=True), rng.integers(40, 120, n, endpoint=True))
+        
+        # Tires: one base pressure per vehicle; with probability equal to the degradation factor the
+        # readings get wider noise and one randomly chosen tire loses 3-8 PSI
+        base_pressure = rng.uniform(*cls.NORMAL_RANGES['tire_pressure'], n)
+        low = rng.random(n) < degradation
+        pressures = base_pressure[:, None] + rng.normal(0, 1, (n, 4)) * np.where(low, 1.0, 0.5)[:, None]
+        pressures[low, rng.integers(0, 4, low.sum())] -= rng.uniform(3, 8, low.sum())
+        
+        error_codes = [[] for _ in range(n)]
+        for i in np.flatnonzero(rng.random(n) < error_probability).tolist():
+            num_errors = int(rng.integers(1, min(3, int(degradation[i] * 5) + 1), endpoint=True))
+            error_codes[i] = rng.choice(cls._ERROR_CODE_KEYS, num_errors, replace=False).tolist()
+        
+        return {
+            'engine_temp': degraded('engine_temp', True),
+            'oil_pressure': degraded('oil_pressure', False),
+            'battery_voltage': degraded('battery_voltage', False),
+            'rpm': rpm,
+            'speed': speed,
+            'vibration_level': degraded('vibration_level', True),
+            'brake_wear': degraded('brake_wear', True),
+            'tire_pressure_fl': pressures[:, 0],
+            'tire_pressure_fr': pressures[:, 1],
+            'tire_pressure_rl': pressures[:, 2],
+            'tire_pressure_rr': pressures[:, 3],
+            'fuel_level': rng.uniform(*cls.NORMAL_RANGES['fuel_level'], n),
+            'coolant_temp': degraded('coolant_temp', True),
+            'error_codes': error_codes
+        }
+    
     def _generate_with_degradation(self, param: str, bias_high: bool = True) -> float:
         min_val, max_val = self.NORMAL_RANGES[param]
         base_value = random.uniform(min_val, max_val)
@@ -146,7 +257,7 @@ class TelemetrySimulator:
         
         if random.random() < self.error_probability:
             num_errors = random.randint(1, min(3, int(self.degradation_factor * 5) + 1))
-            error_codes = random.sample(list(self.ERROR_CODES.keys()), num_errors)
+            error_codes = random.sample(self._ERROR_CODE_KEYS, num_errors)
         
         return error_codes
     
@@ -157,19 +268,16 @@ class TelemetrySimulator:
         initial_degradation = max(0, self.degradation_factor - 0.3)
         degradation_increment = (self.degradation_factor - initial_degradation) / (days * readings_per_day)
         
-        for day in range(days, 0, -1):
-            for reading in range(readings_per_day):
-                timestamp = current_time - timedelta(days=day, hours=reading * 6)
-                
-                temp_degradation = initial_degradation + (degradation_increment * ((days - day) * readings_per_day + reading))
-                original_degradation = self.degradation_factor
-                self.degradation_factor = temp_degradation
-                
-                telemetry = self.generate_telemetry()
-                telemetry['timestamp'] = timestamp.isoformat()
-                historical_data.append(telemetry)
-                
-                self.degradation_factor = original_degradation
+        original_degradation = self.degradation_factor
+        try:
+            for day in range(days, 0, -1):
+                for reading in range(readings_per_day):
+                    timestamp = current_time - timedelta(days=day, hours=reading * 6)
+                    
+                    self.degradation_factor = initial_degradation + (degradation_increment * ((days - day) * readings_per_day + reading))
+                    historical_data.append(self.generate_telemetry(timestamp.isoformat()))
+        finally:
+            self.degradation_factor = original_degradation
         
         return historical_data
 
@@ -182,39 +290,44 @@ def generate_fleet_telemetry(vehicle_ids: List[int], scenario_distribution: Dict
             'random': 0.05
         }
     
-    fleet_telemetry = []
+    scenarios = np.random.choice(
+        list(scenario_distribution.keys()),
+        size=len(vehicle_ids),
+        p=list(scenario_distribution.values())
+    ).tolist()
     
-    for vehicle_id in vehicle_ids:
-        scenario = np.random.choice(
-            list(scenario_distribution.keys()),
-            p=list(scenario_distribution.values())
-        )
-        
-        simulator = TelemetrySimulator(vehicle_id, scenario)
-        telemetry = simulator.generate_telemetry()
+    fleet_telemetry = TelemetrySimulator.generate_batch(vehicle_ids, scenarios)
+    for telemetry, scenario in zip(fleet_telemetry, scenarios):
         telemetry['scenario'] = scenario
-        fleet_telemetry.append(telemetry)
     
     return fleet_telemetry
 
+# (parameter, default reading, display name, warning min, warning max, critical min, critical max),
+# resolved from the threshold dicts once at import rather than on every analyze_telemetry_anomalies call
+ANOMALY_CHECKS = tuple(
+    (
+        param, default, display_name,
+        TelemetrySimulator.WARNING_THRESHOLDS[param]['min'], TelemetrySimulator.WARNING_THRESHOLDS[param]['max'],
+        TelemetrySimulator.CRITICAL_THRESHOLDS[param]['min'], TelemetrySimulator.CRITICAL_THRESHOLDS[param]['max']
+    )
+    for param, default, display_name in (
+        ('engine_temp', 90, 'Engine Temperature'),
+        ('oil_pressure', 40, 'Oil Pressure'),
+        ('battery_voltage', 12.6, 'Battery Voltage'),
+        ('vibration_level', 1.0, 'Vibration Level'),
+        ('brake_wear', 20, 'Brake Wear'),
+        ('coolant_temp', 90, 'Coolant Temperature')
+    )
+)
+
 def analyze_telemetry_anomalies(telemetry: Dict) -> Dict:
     anomalies = []
     severity_score = 0
     
-    checks = [
-        ('engine_temp', telemetry.get('engine_temp', 90), 'Engine Temperature'),
-        ('oil_pressure', telemetry.get('oil_pressure', 40), 'Oil Pressure'),
-        ('battery_voltage', telemetry.get('battery_voltage', 12.6), 'Battery Voltage'),
-        ('vibration_level', telemetry.get('vibration_level', 1.0), 'Vibration Level'),
-        ('brake_wear', telemetry.get('brake_wear', 20), 'Brake Wear'),
-        ('coolant_temp', telemetry.get('coolant_temp', 90), 'Coolant Temperature')
-    ]
-    
-    for param, value, display_name in checks:
-        warning = TelemetrySimulator.WARNING_THRESHOLDS.get(param, {})
-        critical = TelemetrySimulator.CRITICAL_THRESHOLDS.get(param, {})
+    for param, default, display_name, warning_min, warning_max, critical_min, critical_max in ANOMALY_CHECKS:
+        value = telemetry.get(param, default)
         
-        if value < critical.get('min', float('-inf')) or value > critical.get('max', float('inf')):
+        if value < critical_min or value > critical_max:
             anomalies.append({
                 'parameter': display_name,
                 'value': value,
@@ -222,7 +335,7 @@ def analyze_telemetry_anomalies(telemetry: Dict) -> Dict:
                 'message': f'{display_name} is at critical level: {value}'
             })
             severity_score += 30
-        elif value < warning.get('min', float('-inf')) or value > warning.get('max', float('inf')):
+        elif value < warning_min or value > warning_max:
             anomalies.append({
                 'parameter': display_name,
                 'value': value,
@@ -276,3 +389,36 @@ def analyze_telemetry_anomalies(telemetry: Dict) -> Dict:
         'health_score': health_score,
         'anomaly_count': len(anomalies)
     }
+
+def analyze_telemetry_anomalies_batch(columns: Dict) -> Dict[str, np.ndarray]:
+    """analyze_telemetry_anomalies over column arrays (as from generate_telemetry_soa), one entry per record.
+    Returns the per-record scores and counts only; use the single-record function for anomaly messages"""
+    n = len(next(iter(columns.values())))
+    severity_score = np.zeros(n, dtype=int)
+    anomaly_count = np.zeros(n, dtype=int)
+    
+    for param, default, _, warning_min, warning_max, critical_min, critical_max in ANOMALY_CHECKS:
+        values = np.asarray(columns[param]) if param in columns else np.full(n, default)
+        critical = (values < critical_min) | (values > critical_max)
+        warning = ~critical & ((values < warning_min) | (values > warning_max))
+        severity_score += 30 * critical + 15 * warning
+        anomaly_count += critical | warning
+    
+    for field in ('tire_pressure_fl', 'tire_pressure_fr', 'tire_pressure_rl', 'tire_pressure_rr'):
+        pressure = np.asarray(columns[field]) if field in columns else np.full(n, 32)
+        abnormal = (pressure < 28) | (pressure > 38)
+        critical = (pressure < 25) | (pressure > 42)
+        severity_score += np.where(abnormal, np.where(critical, 20, 10), 0)
+        anomaly_count += abnormal
+    
+    if 'error_codes' in columns:
+        error_count = np.fromiter((len(codes) for codes in columns['error_codes']), dtype=int, count=n)
+        severity_score += 25 * error_count
+        anomaly_count += error_count
+    
+    return {
+        'severity_score': severity_score,
+        'overall_status': np.where(severity_score >= 50, 'critical', np.where(severity_score >= 20, 'warning', 'healthy')),
+        'health_score': np.maximum(0, 100 - severity_score),
+        'anomaly_count': anomaly_count
+    }